@@ -0,0 +1,58 @@
+"""JWT-аутентификация с кэшированием пользователя."""
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from api.cache import get_cache
+from reviews.models import User
+
+USER_KEY = 'api:auth-user:{}'
+# Поля, которых достаточно для проверок прав в api/permissions.py, в
+# порядке полей модели, как того требует Model.from_db.
+USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {'id', 'username', 'role', 'is_superuser', 'is_active'}
+)
+
+
+def forget_user(pk):
+    """Удаляет пользователя из кэша аутентификации."""
+    get_cache().delete(USER_KEY.format(pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Берёт пользователя из токена без запроса к БД, если он есть в кэше.
+    В кэше хранится только USER_FIELDS: остальные поля экземпляра
+    отложены и загружаются из БД при обращении.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                'Токен не содержит идентификатор пользователя.',
+                code='token_not_valid'
+            )
+
+        cache = get_cache()
+        key = USER_KEY.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = User.objects.filter(pk=user_id).values_list(
+                *USER_FIELDS
+            ).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    'Пользователь не найден.', code='user_not_found'
+                )
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        user = User.from_db(User.objects.db, USER_FIELDS, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        return user
@@ -0,0 +1,142 @@
+"""
+Подсказки при вводе по названиям произведений, жанров и категорий.
+
+Индекс - отсортированные массивы слов названий в памяти процесса,
+отдельный для каждого вида подсказок, поиск по префиксу - двоичный
+поиск bisect. Индекс строится при первом запросе и перестраивается,
+когда меняется версия одного из ресурсов в кэше API (см.
+api/signals.py), поэтому все воркеры видят изменения, сделанные любым
+из них.
+"""
+import re
+import threading
+from bisect import bisect_left
+from heapq import merge
+
+from api.cache import get_versions
+from reviews.models import Category, Genre, Title
+
+TITLE = 'title'
+GENRE = 'genre'
+CATEGORY = 'category'
+KINDS = (TITLE, GENRE, CATEGORY)
+SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """Приводит строку к виду для сравнения: 'Ёж-2' -> 'еж 2'."""
+    return ' '.join(
+        SEPARATORS.split(str(text).casefold().replace('ё', 'е'))
+    ).strip()
+
+
+def matches(words, terms):
+    """
+    Слова words начинаются с terms: все, кроме последнего, совпадают
+    целиком, последнее - как префикс.
+    """
+    *complete, last = terms
+    return (
+        len(words) >= len(terms) and words[:len(complete)] == complete
+        and words[len(complete)].startswith(last)
+    )
+
+
+class PrefixIndex:
+    """
+    Неизменяемый индекс: для каждого вида - слова названий по
+    возрастанию и ссылки на место слова в названии. Объект хранится под
+    каждым своим словом, поэтому 'шоу' находит 'Побег из Шоушенка', а
+    память растёт линейно от длины названий.
+    """
+
+    def __init__(self, items):
+        self.items = [
+            ([normalize(text).split() for text in texts], suggestion)
+            for texts, suggestion in items
+        ]
+        self.keys, self.refs = {}, {}
+        for kind in KINDS:
+            entries = sorted(
+                (words[position], number, text, position)
+                for number, (texts, suggestion) in enumerate(self.items)
+                if suggestion['type'] == kind
+                for text, words in enumerate(texts)
+                for position in range(len(words))
+            )
+            self.keys[kind] = [entry[0] for entry in entries]
+            self.refs[kind] = [entry[1:] for entry in entries]
+
+    def find(self, kind, terms):
+        """
+        Совпадения вида kind по возрастанию слова: (слово, номер объекта).
+        Просматривает только диапазон ключей, начинающихся с terms[0],
+        а для запроса из нескольких слов - равных ему.
+        """
+        keys, first = self.keys[kind], terms[0]
+        for idx in range(bisect_left(keys, first), len(keys)):
+            key = keys[idx]
+            if not key.startswith(first) or len(terms) > 1 and key != first:
+                return
+            number, text, position = self.refs[kind][idx]
+            if matches(self.items[number][0][text][position:], terms):
+                yield key, number
+
+    def search(self, prefix, limit, kinds=KINDS):
+        """
+        Первые по алфавиту limit подсказок с названием, слова которого
+        начинаются с prefix.
+        """
+        terms = normalize(prefix).split()
+        if not terms:
+            return []
+        found, seen = [], set()
+        for _, number in merge(*(self.find(kind, terms) for kind in kinds)):
+            if len(found) >= limit:
+                break
+            if number not in seen:
+                seen.add(number)
+                found.append(self.items[number][1])
+        return found
+
+
+def load_items():
+    """Названия и слаги из БД: три запроса только нужных полей."""
+    for pk, name in Title.objects.values_list('pk', 'name'):
+        yield (name,), {'type': TITLE, 'id': pk, 'name': name}
+    for model, kind in ((Genre, GENRE), (Category, CATEGORY)):
+        for name, slug in model.objects.values_list('name', 'slug'):
+            yield (name, slug), {'type': kind, 'name': name, 'slug': slug}
+
+
+class Autocomplete:
+    """Лениво строит индекс и перестраивает его при смене версий."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.versions = None
+
+    def get_index(self):
+        """
+        Пока один поток перестраивает индекс, остальные получают
+        прежний, а не ждут.
+        """
+        versions = get_versions(KINDS)
+        if versions == self.versions:
+            return self.index
+        if not self.lock.acquire(blocking=self.index is None):
+            return self.index
+        try:
+            if versions != self.versions:
+                self.index = PrefixIndex(list(load_items()))
+                self.versions = versions
+        finally:
+            self.lock.release()
+        return self.index
+
+    def search(self, prefix, limit, kinds=KINDS):
+        return self.get_index().search(prefix, limit, kinds)
+
+
+autocomplete = Autocomplete()
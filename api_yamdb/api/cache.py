@@ -0,0 +1,113 @@
+"""Кэш ответов API с версионной инвалидацией по ресурсам."""
+import hashlib
+import math
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api import metrics
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+STATS_KEY = 'api:stats:{}'
+HITS = 'hits'
+MISSES = 'misses'
+# Меняется при массовой загрузке, когда неизвестно, какие родительские
+# объекты затронуты; входит в ресурсы вложенных списков.
+BULK = 'bulk'
+
+
+def scoped(resource, parent, pk):
+    """Ресурс в пределах одного родителя: отзывы одного произведения."""
+    return f'{resource}:{parent}={pk}'
+
+
+def get_cache():
+    """Возвращает бэкенд кэша API из настроек."""
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions(resources):
+    """Возвращает текущие версии ресурсов, создавая отсутствующие."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*resources):
+    """Меняет версии ресурсов, делая устаревшими все зависящие ответы."""
+    version = time.time_ns()
+    get_cache().set_many(
+        {VERSION_KEY.format(resource): version for resource in resources},
+        timeout=None
+    )
+
+
+def make_response_key(request, resources):
+    """
+    Строит ключ из пути, нормализованных параметров запроса и версий
+    ресурсов, от которых зависит ответ.
+    """
+    params = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = f'{request.path}?{params}|{get_versions(resources)}'
+    return RESPONSE_KEY.format(hashlib.sha256(raw.encode()).hexdigest())
+
+
+def make_etag(request, resources):
+    """
+    Строит сильный ETag, время изменения для Last-Modified и версию
+    ответа (в наносекундах) по версиям ресурсов, не выполняя запросов к
+    БД и сериализации. Время изменения округляется вверх до секунды,
+    если эта секунда уже прошла, иначе вниз: изменение в ту же секунду
+    не должно дать устаревший ответ 304.
+    """
+    versions = get_versions(resources)
+    params = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = (
+        f'{request.path}?{params}|{request.user.pk}|'
+        f'{request.accepted_media_type}|{versions}'
+    )
+    etag = '"{}"'.format(hashlib.sha256(raw.encode()).hexdigest())
+    version = max(versions, default=0)
+    last_modified = math.ceil(version / 10 ** 9)
+    if last_modified > time.time():
+        last_modified = version // 10 ** 9
+    return etag, last_modified, version
+
+
+def record(event):
+    """Увеличивает счётчик попаданий или промахов кэша."""
+    metrics.inc(metrics.CACHE_REQUESTS, (('result', event),))
+    cache = get_cache()
+    key = STATS_KEY.format(event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    """Возвращает счётчики попаданий и промахов кэша."""
+    keys = {STATS_KEY.format(event): event for event in (HITS, MISSES)}
+    stats = dict.fromkeys(keys.values(), 0)
+    for key, value in get_cache().get_many(keys).items():
+        stats[keys[key]] = value
+    return stats
@@ -1,6 +1,35 @@
+import math
+
+from django.db.models import F
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews.models import Comment, Review, Title
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """
+    Произведения без оценок - в конце при любом направлении сортировки,
+    при равных значениях - по названию.
+
+    Индексы (поле, name) подходят для сортировки по возрастанию: SQLite
+    и PostgreSQL читают их по порядку. При сортировке по убыванию SQLite
+    досортировывает равные значения по названию, а PostgreSQL не
+    использует индекс для DESC NULLS LAST и сортирует выборку целиком.
+    """
+
+    def get_ordering_value(self, param):
+        descending = param.startswith('-')
+        field = F(self.param_map.get(param.lstrip('-'), param.lstrip('-')))
+        if descending:
+            return field.desc(nulls_last=True)
+        return field.asc(nulls_last=True)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.order_by(
+            *(self.get_ordering_value(param) for param in value), 'name', 'id'
+        )
 
 
 class TitleFilter(filters.FilterSet):
@@ -10,7 +39,91 @@ class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='category__slug',
                                   lookup_expr='exact')
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(
+        method='filter_rating', max_digits=4, decimal_places=2
+    )
+    rating_max = filters.NumberFilter(
+        method='filter_rating', max_digits=4, decimal_places=2
+    )
+    search = filters.CharFilter(method='filter_search')
+    ordering = TitleOrderingFilter(fields=(
+        ('rating', 'rating'),
+        ('year', 'year'),
+        ('name', 'name'),
+        ('rating_count', 'review_count'),
+    ))
 
     class Meta:
         model = Title
         fields = ['genre', 'category', 'name', 'year']
+
+    def filter_rating(self, queryset, name, value):
+        """
+        Сравнивает value с точной средней оценкой rating_sum / rating_count
+        в целых числах: 7.9 не меньше 8 и больше 7. Условие по хранимому
+        округлённому вниз rating отбирает кандидатов по индексу.
+        """
+        lookup = 'gte' if name == 'rating_min' else 'lte'
+        numerator, denominator = value.as_integer_ratio()
+        scaled_sum = f'{name}_sum'
+        return queryset.alias(
+            **{scaled_sum: F('rating_sum') * denominator}
+        ).filter(**{
+            f'rating__{lookup}': math.floor(value),
+            f'{scaled_sum}__{lookup}': F('rating_count') * numerator,
+        })
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск; если сортировка не задана параметром
+        ordering, самые релевантные произведения первыми.
+        """
+        queryset = queryset.search(value)
+        if self.data.get('ordering'):
+            return queryset
+        return queryset.order_by('-search_rank', 'name')
+
+
+class LeaderboardFilter(filters.FilterSet):
+    genre = filters.CharFilter(field_name='genre__slug')
+    category = filters.CharFilter(field_name='category__slug')
+
+    class Meta:
+        model = Title
+        fields = ['genre', 'category']
+
+
+class TextSearchFilter(filters.FilterSet):
+    """Поиск по тексту отзывов и комментариев с фильтрами модерации."""
+    search = filters.CharFilter(method='filter_search')
+    author = filters.CharFilter(field_name='author__username')
+    date_from = filters.IsoDateTimeFilter(
+        field_name='pub_date', lookup_expr='gte'
+    )
+    date_to = filters.IsoDateTimeFilter(
+        field_name='pub_date', lookup_expr='lt'
+    )
+
+    def filter_search(self, queryset, name, value):
+        """Самые релевантные первыми, при равенстве - новые."""
+        return queryset.search(value).order_by(
+            '-search_rank', '-pub_date', '-id'
+        )
+
+
+class ReviewSearchFilter(TextSearchFilter):
+    title = filters.NumberFilter(field_name='title')
+
+    class Meta:
+        model = Review
+        fields = ['title', 'author', 'score']
+
+
+class CommentSearchFilter(TextSearchFilter):
+    title = filters.NumberFilter(field_name='review__title')
+
+    class Meta:
+        model = Comment
+        fields = ['title', 'review', 'author']
@@ -0,0 +1,123 @@
+"""Отправка писем через переиспользуемые соединения с почтовым сервером."""
+import threading
+import time
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from api import metrics
+
+SENT = 'sent'
+FAILED = 'failed'
+# Ошибки, после которых письмо можно отправить повторно через новое
+# соединение: сервер его не принял. Отказ в адресате или ошибка в самом
+# письме при повторе привели бы к тому же или к дублю.
+RECONNECT_ERRORS = (SMTPServerDisconnected, ConnectionError)
+
+
+class Mailer:
+    """
+    Держит в каждом потоке своё соединение с почтовым бэкендом, чтобы
+    синхронные отправки из разных потоков не ждали друг друга, и
+    отправляет через него письма пакетами. Соединение открывается заново
+    после простоя дольше EMAIL_CONNECTION_IDLE_TIMEOUT, после
+    EMAIL_CONNECTION_MAX_MESSAGES писем, после ошибки и после смены
+    почтовых настроек.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.generation = 0
+
+    @property
+    def connection(self):
+        return getattr(self.local, 'connection', None)
+
+    def get_connection(self):
+        local = self.local
+        expired = (
+            time.monotonic() - local.used_at
+            > settings.EMAIL_CONNECTION_IDLE_TIMEOUT
+            or local.sent_on_connection
+            >= settings.EMAIL_CONNECTION_MAX_MESSAGES
+            or local.generation != self.generation
+        ) if self.connection is not None else False
+        if expired:
+            self.close()
+        if self.connection is None:
+            local.connection = get_connection(fail_silently=False)
+            local.connection.open()
+            local.sent_on_connection = 0
+            local.used_at = time.monotonic()
+            local.generation = self.generation
+        return local.connection
+
+    def close(self):
+        """Закрывает соединение текущего потока."""
+        connection = self.connection
+        if connection is None:
+            return
+        self.local.connection = None
+        connection.close()
+
+    def close_idle(self):
+        """Закрывает соединение потока, простаивающее дольше допустимого."""
+        if self.connection is not None and time.monotonic() - (
+            self.local.used_at
+        ) > settings.EMAIL_CONNECTION_IDLE_TIMEOUT:
+            self.close()
+
+    def reset(self):
+        """Соединения всех потоков откроются заново при следующей отправке."""
+        self.generation += 1
+        self.close()
+
+    def send_one(self, message):
+        """
+        Отправляет письмо; если переиспользованное соединение оборвалось,
+        повторяет отправку один раз через новое.
+        """
+        reused = self.connection is not None
+        try:
+            self.get_connection().send_messages([message])
+        except RECONNECT_ERRORS:
+            self.close()
+            if not reused:
+                raise
+            self.get_connection().send_messages([message])
+        self.local.sent_on_connection += 1
+        self.local.used_at = time.monotonic()
+
+    def send(self, messages):
+        """
+        Отправляет письма и возвращает список ошибок того же размера:
+        None означает, что письмо отправлено.
+        """
+        errors = []
+        for message in messages:
+            try:
+                with metrics.timer(metrics.EMAIL_DURATION):
+                    self.send_one(message)
+            except Exception as error:
+                self.close()
+                errors.append(error)
+            else:
+                errors.append(None)
+        failed = sum(error is not None for error in errors)
+        metrics.inc(metrics.EMAILS_SENT, (('result', SENT),),
+                    len(errors) - failed)
+        metrics.inc(metrics.EMAILS_SENT, (('result', FAILED),), failed)
+        return errors
+
+
+mailer = Mailer()
+
+
+@receiver(setting_changed)
+def reset_mailer(setting, **kwargs):
+    """Сбрасывает соединения при смене почтовых настроек (в тестах)."""
+    if setting.startswith('EMAIL_'):
+        mailer.reset()
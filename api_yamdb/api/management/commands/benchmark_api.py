@@ -0,0 +1,487 @@
+import json
+import logging
+import math
+import statistics
+import subprocess
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import URLPattern, URLResolver, resolve
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import urls as api_urls
+from api.middleware import QUERY_COUNT_HEADER
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+API_PREFIX = '/api/v1/'
+BENCHMARK_USERNAME = 'benchmark_admin'
+DUMMY_CACHE = 'django.core.cache.backends.dummy.DummyCache'
+LOCMEM_EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    data: dict = None
+    params: dict = None
+    auth: bool = False
+    expected: int = 200
+
+    def get_data(self):
+        return self.data() if callable(self.data) else self.data
+
+
+class ConfirmationCodes:
+    """
+    Выдаёт каждому запросу токена своего пользователя с действующим кодом:
+    успешный запрос гасит код, и повторить его нельзя.
+    """
+
+    prefix = f'{BENCHMARK_USERNAME}_token'
+
+    def __init__(self):
+        self.credentials = iter(())
+
+    def prepare(self, count):
+        User.objects.filter(username__startswith=self.prefix).delete()
+        expires_at = timezone.now() + settings.CONFIRMATION_CODE_LIFETIME
+        users = User.objects.bulk_create(
+            User(
+                username=f'{self.prefix}{idx}',
+                email=f'{self.prefix}{idx}@yamdb.fake',
+                confirmation_code=f'{idx:06d}'[-6:],
+                confirmation_code_expires_at=expires_at,
+            )
+            for idx in range(count)
+        )
+        self.credentials = iter([
+            {'username': user.username,
+             'confirmation_code': user.confirmation_code}
+            for user in users
+        ])
+
+    def __call__(self):
+        return next(self.credentials)
+
+
+@dataclass
+class Result:
+    timings: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    started: float = math.inf
+    finished: float = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, started, finished, status, failed, queries):
+        with self.lock:
+            self.started = min(self.started, started)
+            self.finished = max(self.finished, finished)
+            self.timings.append((finished - started) * 1000)
+            self.statuses[status] += 1
+            self.errors += failed
+            if queries is not None:
+                self.queries.append(queries)
+
+    @property
+    def elapsed(self):
+        return self.finished - self.started
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def route_names(patterns):
+    """Имена всех маршрутов api/urls.py."""
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class DjangoClientTransport:
+    """Выполняет запросы тестовым клиентом Django в текущем процессе."""
+
+    def __init__(self, token):
+        self.client = Client()
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def request(self, scenario):
+        extra = self.auth if scenario.auth else {}
+        with CaptureQueriesContext(connection) as context:
+            if scenario.method == 'get':
+                response = self.client.get(
+                    scenario.path, scenario.params, **extra
+                )
+            else:
+                response = getattr(self.client, scenario.method)(
+                    scenario.path, scenario.get_data(),
+                    content_type='application/json', **extra
+                )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response.status_code, len(context.captured_queries)
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    """Выполняет запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, token, base_url):
+        import requests
+
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+        self.auth = {'Authorization': f'Bearer {token}'}
+
+    def request(self, scenario):
+        response = self.session.request(
+            scenario.method, self.base_url + scenario.path,
+            params=scenario.params, json=scenario.get_data(),
+            headers=self.auth if scenario.auth else None,
+        )
+        queries = response.headers.get(QUERY_COUNT_HEADER)
+        return response.status_code, int(queries) if queries else None
+
+    def close(self):
+        self.session.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержки (p50/p95/p99), число запросов к БД и пропускную '
+        'способность всех маршрутов API на текущих данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Количество измеряемых запросов на сценарий.'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Количество прогревочных запросов на сценарий.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Количество параллельных потоков-клиентов.'
+        )
+        parser.add_argument(
+            '--url', help='Адрес запущенного сервера, например '
+            'http://127.0.0.1:8000. По умолчанию - тестовый клиент Django.'
+        )
+        parser.add_argument(
+            '--only', nargs='*', default=(),
+            help='Запускать только сценарии, содержащие эти подстроки.'
+        )
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Отключить кэш ответов API, чтобы измерить работу ORM.'
+        )
+        parser.add_argument('--output', help='Файл для сохранения JSON.')
+        parser.add_argument(
+            '--compare', help='JSON предыдущего прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('Число запросов и потоков должно быть > 0.')
+        token = str(AccessToken.for_user(self.get_admin()))
+        scenarios = [
+            scenario for scenario in self.build_scenarios()
+            if not options['only'] or any(
+                part in scenario.name for part in options['only']
+            )
+        ]
+        if not options['only']:
+            self.check_coverage(scenarios)
+        per_worker = math.ceil(options['requests'] / options['concurrency'])
+        for scenario in scenarios:
+            if isinstance(scenario.data, ConfirmationCodes):
+                scenario.data.prepare(
+                    (per_worker + options['warmup']) * options['concurrency']
+                )
+
+        results = {}
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            # Ограничение частоты отключено: измеряется стоимость запросов,
+            # а не ответы 429.
+            overrides = {
+                'EMAIL_BACKEND': LOCMEM_EMAIL_BACKEND,
+                'REST_FRAMEWORK': {
+                    **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+                },
+            }
+            if options['no_cache']:
+                overrides['CACHES'] = {
+                    **settings.CACHES,
+                    settings.API_CACHE_ALIAS: {'BACKEND': DUMMY_CACHE},
+                }
+            with override_settings(**overrides):
+                for scenario in scenarios:
+                    results[scenario.name] = self.summarize(
+                        self.run(scenario, token, options)
+                    )
+                    self.print_row(scenario.name, results[scenario.name])
+        finally:
+            request_logger.setLevel(level)
+
+        report = {
+            'meta': {
+                'commit': self.get_commit(),
+                'date': timezone.now().isoformat(),
+                'transport': options['url'] or 'django-client',
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'cache': not options['no_cache'],
+                'vendor': connection.vendor,
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline:
+                self.compare(json.load(baseline)['results'], results)
+
+    def get_admin(self):
+        admin = User.objects.filter(role=User.ADMIN).first()
+        if admin is None:
+            admin, _ = User.objects.get_or_create(
+                username=BENCHMARK_USERNAME,
+                defaults={
+                    'email': f'{BENCHMARK_USERNAME}@yamdb.fake',
+                    'role': User.ADMIN,
+                }
+            )
+        return admin
+
+    def build_scenarios(self):
+        title = Title.objects.order_by('-rating_count').first()
+        review = (
+            Review.objects.annotate(total=Count('comments'))
+            .order_by('-total').first()
+        )
+        comment = Comment.objects.filter(review=review).first()
+        genre = Genre.objects.first()
+        category = Category.objects.first()
+        user = User.objects.order_by('pk').first()
+        if not all((title, review, comment, genre, category)):
+            raise CommandError(
+                'Недостаточно данных: загрузите их командой import_csv '
+                'или generate_data.'
+            )
+        titles = f'{API_PREFIX}titles/'
+        reviews = f'{titles}{title.pk}/reviews/'
+        review_detail = f'{titles}{review.title_id}/reviews/{review.pk}/'
+        comments = f'{review_detail}comments/'
+        last_page = max(math.ceil(title.rating_count / 10), 1)
+        signup = {
+            'username': BENCHMARK_USERNAME + '_signup',
+            'email': f'{BENCHMARK_USERNAME}_signup@yamdb.fake',
+        }
+        return [
+            Scenario('api_root', 'get', API_PREFIX, auth=True),
+            Scenario('signup', 'post', f'{API_PREFIX}auth/signup/', signup),
+            Scenario(
+                'token_obtain', 'post', f'{API_PREFIX}auth/token/',
+                ConfirmationCodes()
+            ),
+            Scenario(
+                'token_invalid_code', 'post', f'{API_PREFIX}auth/token/',
+                {'username': signup['username'], 'confirmation_code': '-'},
+                expected=400
+            ),
+            Scenario('users_list', 'get', f'{API_PREFIX}users/', auth=True),
+            Scenario('users_me', 'get', f'{API_PREFIX}users/me/', auth=True),
+            Scenario(
+                'users_detail', 'get',
+                f'{API_PREFIX}users/{user.username}/', auth=True
+            ),
+            Scenario('genres_list', 'get', f'{API_PREFIX}genres/'),
+            Scenario(
+                'genres_search', 'get', f'{API_PREFIX}genres/',
+                params={'search': genre.name[:3]}
+            ),
+            Scenario(
+                'genres_delete_missing', 'delete',
+                f'{API_PREFIX}genres/benchmark-missing/', auth=True,
+                expected=404
+            ),
+            Scenario('categories_list', 'get', f'{API_PREFIX}categories/'),
+            Scenario(
+                'categories_delete_missing', 'delete',
+                f'{API_PREFIX}categories/benchmark-missing/', auth=True,
+                expected=404
+            ),
+            Scenario('titles_list', 'get', titles),
+            Scenario(
+                'titles_filter_genre', 'get', titles,
+                params={'genre': genre.slug}
+            ),
+            Scenario(
+                'titles_filter_category_year', 'get', titles,
+                params={'category': category.slug, 'year': title.year}
+            ),
+            Scenario(
+                'titles_filter_name', 'get', titles,
+                params={'name': title.name[:4]}
+            ),
+            Scenario('titles_detail', 'get', f'{titles}{title.pk}/'),
+            Scenario('leaderboard', 'get', f'{API_PREFIX}leaderboards/'),
+            Scenario(
+                'leaderboard_genre', 'get', f'{API_PREFIX}leaderboards/',
+                params={'genre': genre.slug}
+            ),
+            Scenario('reviews_list', 'get', reviews),
+            Scenario(
+                'reviews_list_last_page', 'get', reviews,
+                params={'page': last_page}
+            ),
+            Scenario(
+                'reviews_list_cursor', 'get', reviews,
+                params={'pagination': 'cursor'}
+            ),
+            Scenario('reviews_detail', 'get', review_detail),
+            Scenario('comments_list', 'get', comments),
+            Scenario(
+                'comments_list_cursor', 'get', comments,
+                params={'pagination': 'cursor'}
+            ),
+            Scenario('comments_detail', 'get', f'{comments}{comment.pk}/'),
+            Scenario(
+                'export_titles', 'get', f'{API_PREFIX}export/titles/',
+                auth=True
+            ),
+        ]
+
+    def check_coverage(self, scenarios):
+        covered = {resolve(scenario.path).url_name for scenario in scenarios}
+        missing = route_names(api_urls.urlpatterns) - covered
+        if missing:
+            self.stderr.write(
+                'Маршруты без сценариев: ' + ', '.join(sorted(missing))
+            )
+
+    def run(self, scenario, token, options):
+        result = Result()
+        per_worker = math.ceil(options['requests'] / options['concurrency'])
+        barrier = threading.Barrier(options['concurrency'])
+        failures = []
+
+        def worker():
+            if options['url']:
+                transport = HttpTransport(token, options['url'])
+            else:
+                transport = DjangoClientTransport(token)
+            try:
+                for _ in range(options['warmup']):
+                    transport.request(scenario)
+                barrier.wait()
+                for _ in range(per_worker):
+                    started = time.perf_counter()
+                    status, queries = transport.request(scenario)
+                    result.add(
+                        started, time.perf_counter(), status,
+                        status != scenario.expected, queries
+                    )
+            except Exception as error:
+                failures.append(error)
+                barrier.abort()
+            finally:
+                transport.close()
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise CommandError(
+                f'Сценарий {scenario.name} завершился ошибкой: {failures[0]!r}'
+            )
+        return result
+
+    def summarize(self, result):
+        timings = result.timings
+        return {
+            'requests': len(timings),
+            'errors': result.errors,
+            'statuses': dict(result.statuses),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries': (
+                round(statistics.mean(result.queries), 2)
+                if result.queries else None
+            ),
+            'rps': round(len(timings) / result.elapsed, 1),
+        }
+
+    def print_row(self, name, stats):
+        line = (
+            f'{name:<30} p50 {stats["p50_ms"]:>8.2f} мс  '
+            f'p95 {stats["p95_ms"]:>8.2f} мс  p99 {stats["p99_ms"]:>8.2f} мс  '
+            f'{stats["rps"]:>8.1f} rps  запросов к БД: {stats["queries"]}'
+        )
+        if stats['errors']:
+            line += f'  ошибки: {stats["errors"]} {stats["statuses"]}'
+            self.stdout.write(self.style.WARNING(line))
+        else:
+            self.stdout.write(line)
+
+    def compare(self, baseline, results):
+        self.stdout.write(self.style.MIGRATE_HEADING('Сравнение с базовым'))
+        for name, stats in results.items():
+            if name not in baseline:
+                continue
+            before, after = baseline[name]['p95_ms'], stats['p95_ms']
+            change = (after - before) / before * 100 if before else 0
+            line = (
+                f'{name:<30} p95 {before:.2f} -> {after:.2f} мс '
+                f'({change:+.1f}%)'
+            )
+            if baseline[name].get('queries') != stats['queries']:
+                line += (
+                    f'  запросов к БД: {baseline[name].get("queries")} -> '
+                    f'{stats["queries"]}'
+                )
+            self.stdout.write(line)
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ('git', 'rev-parse', '--short', 'HEAD'),
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
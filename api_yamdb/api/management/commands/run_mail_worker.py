@@ -0,0 +1,114 @@
+import signal
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from api.mail import mailer
+from reviews.models import OutgoingEmail
+
+# На это время письма пакета резервируются за воркером: если он упадёт
+# во время отправки, письма вернутся в очередь.
+LEASE = timedelta(minutes=5)
+MAX_BACKOFF = timedelta(hours=1)
+UPDATE_FIELDS = (
+    'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at',
+    'claimed_by',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пакетами через общее SMTP-соединение, '
+        'повторяя неудачные попытки с экспоненциальной задержкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем, резервируемых воркером за раз.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Число попыток, после которого письмо считается неудачным.'
+        )
+        parser.add_argument(
+            '--backoff', type=float, default=30.0,
+            help='Задержка перед первой повторной попыткой, в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить все готовые письма и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        while self.running:
+            emails = self.claim(options['batch_size'])
+            if emails:
+                self.deliver(emails, options)
+            elif options['once']:
+                break
+            else:
+                mailer.close_idle()
+                time.sleep(options['interval'])
+        mailer.close()
+
+    def stop(self, signum, frame):
+        self.running = False
+
+    def claim(self, batch_size):
+        """
+        Резервирует пакет готовых писем условным UPDATE: письмо достаётся
+        тому воркеру, чей UPDATE застал его свободным. В отличие от
+        select_for_update(skip_locked=True) работает и в SQLite.
+        """
+        now = timezone.now()
+        free = Q(claimed_by__isnull=True) | Q(claimed_at__lt=now - LEASE)
+        ids = list(
+            OutgoingEmail.objects.due().filter(free)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        token = uuid.uuid4()
+        OutgoingEmail.objects.due().filter(free, pk__in=ids).update(
+            claimed_by=token, claimed_at=now
+        )
+        return list(OutgoingEmail.objects.filter(pk__in=ids, claimed_by=token))
+
+    def deliver(self, emails, options):
+        errors = mailer.send([email.to_message() for email in emails])
+        for email, error in zip(emails, errors):
+            email.attempts += 1
+            email.claimed_by = None
+            if error is None:
+                email.status = OutgoingEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+            else:
+                self.schedule_retry(email, error, options)
+        OutgoingEmail.objects.bulk_update(emails, UPDATE_FIELDS)
+        self.stdout.write(
+            f'Отправлено {errors.count(None)} из {len(emails)} писем.'
+        )
+
+    def schedule_retry(self, email, error, options):
+        email.last_error = repr(error)
+        if email.attempts >= options['max_attempts']:
+            email.status = OutgoingEmail.FAILED
+            return
+        delay = timedelta(
+            seconds=options['backoff'] * 2 ** (email.attempts - 1)
+        )
+        email.next_attempt_at = timezone.now() + min(delay, MAX_BACKOFF)
@@ -0,0 +1,294 @@
+"""
+Метрики запросов, БД, кэша и почты в текстовом формате Prometheus.
+
+Каждый процесс копит значения в памяти. Если задан METRICS_DIR,
+процесс периодически сбрасывает снимок в файл, а /metrics суммирует
+снимки всех воркеров и архив. Снимок завершившегося воркера
+переносится в архив, а не удаляется: иначе суммы счётчиков уменьшались
+бы и Prometheus принимал бы это за их сброс. Снимки хранят только
+счётчики и гистограммы, датчики вычисляются при сборе. Каталог должен
+быть своим для каждого хоста: живость воркера проверяется по pid.
+"""
+import fcntl
+import ipaddress
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+REQUESTS = 'yamdb_http_requests_total'
+REQUEST_DURATION = 'yamdb_http_request_duration_seconds'
+DB_QUERIES = 'yamdb_db_queries_total'
+DB_DURATION = 'yamdb_db_duration_seconds'
+CACHE_REQUESTS = 'yamdb_cache_requests_total'
+CACHE_HIT_RATIO = 'yamdb_cache_hit_ratio'
+EMAIL_DURATION = 'yamdb_email_send_duration_seconds'
+EMAILS_SENT = 'yamdb_emails_total'
+CACHE_HIT = 'hits'
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+METRICS = {
+    REQUESTS: (COUNTER, 'Количество HTTP-запросов.'),
+    REQUEST_DURATION: (HISTOGRAM, 'Время обработки HTTP-запроса.'),
+    DB_QUERIES: (COUNTER, 'Количество SQL-запросов.'),
+    DB_DURATION: (HISTOGRAM, 'Время работы БД за HTTP-запрос.'),
+    CACHE_REQUESTS: (COUNTER, 'Обращения к кэшу ответов API.'),
+    CACHE_HIT_RATIO: (GAUGE, 'Доля попаданий в кэш ответов API.'),
+    EMAIL_DURATION: (HISTOGRAM, 'Время отправки письма.'),
+    EMAILS_SENT: (COUNTER, 'Количество отправленных и неотправленных писем.'),
+}
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SNAPSHOT_FILE = 'metrics-{}.json'
+ARCHIVE_FILE = 'archive.json'
+ARCHIVE_LOCK_FILE = 'archive.lock'
+
+
+class Registry:
+    """
+    Счётчики и гистограммы процесса. Гистограмма хранит число значений
+    в каждом интервале BUCKETS (последний - выше всех границ) и сумму.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.flushed_at = time.monotonic()
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, labels)
+        with self.lock:
+            data = self.histograms.get(key)
+            if data is None:
+                data = self.histograms[key] = [0] * (len(BUCKETS) + 2)
+            data[bisect_left(BUCKETS, value)] += 1
+            data[-1] += value
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return make_snapshot(self.counters, self.histograms)
+
+
+def make_snapshot(counters, histograms):
+    """Снимок для JSON: списки [имя, метки, значение]."""
+    return {
+        'counters': [
+            [name, labels, value]
+            for (name, labels), value in counters.items()
+        ],
+        'histograms': [
+            [name, labels, list(data)]
+            for (name, labels), data in histograms.items()
+        ],
+    }
+
+
+REGISTRY = Registry()
+
+
+def inc(name, labels=(), value=1):
+    REGISTRY.inc(name, labels, value)
+
+
+def observe(name, value, labels=()):
+    REGISTRY.observe(name, value, labels)
+
+
+@contextmanager
+def timer(name, labels=()):
+    """Измеряет время выполнения блока и добавляет его в гистограмму."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - started, labels)
+
+
+def flush():
+    """Атомарно сохраняет снимок метрик процесса в METRICS_DIR."""
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    write_snapshot(
+        directory / SNAPSHOT_FILE.format(os.getpid()), REGISTRY.snapshot()
+    )
+    REGISTRY.flushed_at = time.monotonic()
+
+
+def read_snapshot(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def write_snapshot(path, snapshot):
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(snapshot), encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def flush_if_due():
+    """Сохраняет снимок, если включён многопроцессный режим и пора."""
+    if not settings.METRICS_DIR:
+        return
+    if time.monotonic() - REGISTRY.flushed_at >= (
+        settings.METRICS_FLUSH_INTERVAL
+    ):
+        flush()
+
+
+def is_dead(path):
+    """Снимок воркера, процесса которого больше нет."""
+    try:
+        os.kill(int(path.stem.rsplit('-', 1)[1]), 0)
+    except (ProcessLookupError, ValueError):
+        return True
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return False
+    return False
+
+
+def archive(path):
+    """
+    Прибавляет счётчики и гистограммы снимка завершившегося воркера к
+    архиву и удаляет снимок. Под файловой блокировкой, чтобы два воркера
+    не перенесли один снимок дважды.
+    """
+    directory = path.parent
+    with open(directory / ARCHIVE_LOCK_FILE, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            snapshots = [read_snapshot(path)]
+        except FileNotFoundError:
+            # Снимок уже перенёс другой воркер.
+            return
+        archive_path = directory / ARCHIVE_FILE
+        if archive_path.exists():
+            snapshots.append(read_snapshot(archive_path))
+        write_snapshot(archive_path, make_snapshot(*combine(snapshots)))
+        path.unlink()
+
+
+def collect():
+    """
+    Возвращает снимок процесса или снимки всех живых воркеров и архив
+    завершившихся.
+    """
+    if not settings.METRICS_DIR:
+        return [REGISTRY.snapshot()]
+    flush()
+    directory = Path(settings.METRICS_DIR)
+    snapshots = []
+    for path in directory.glob(SNAPSHOT_FILE.format('*')):
+        try:
+            if is_dead(path):
+                archive(path)
+                continue
+            snapshots.append(read_snapshot(path))
+        except FileNotFoundError:
+            # Снимок перенёс в архив другой воркер.
+            continue
+    try:
+        snapshots.append(read_snapshot(directory / ARCHIVE_FILE))
+    except FileNotFoundError:
+        pass
+    return snapshots
+
+
+def is_allowed(address):
+    """Входит ли адрес клиента в METRICS_ALLOWED_IPS."""
+    if '*' in settings.METRICS_ALLOWED_IPS:
+        return True
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def combine(snapshots):
+    """Суммирует счётчики и гистограммы снимков."""
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, data in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(data))
+            for idx, value in enumerate(data):
+                total[idx] += value
+    return counters, histograms
+
+
+def merge(snapshots):
+    """Суммирует снимки и вычисляет долю попаданий в кэш."""
+    counters, histograms = combine(snapshots)
+    hits = counters.get((CACHE_REQUESTS, (('result', CACHE_HIT),)), 0)
+    total = sum(
+        value for (name, _), value in counters.items()
+        if name == CACHE_REQUESTS
+    )
+    gauges = {}
+    if total:
+        gauges[(CACHE_HIT_RATIO, ())] = hits / total
+    return counters, gauges, histograms
+
+
+def format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_histogram(name, labels, data):
+    cumulative = 0
+    for bound, count in zip(BUCKETS + ('+Inf',), data):
+        cumulative += count
+        yield (
+            f'{name}_bucket{format_labels(labels, (("le", bound),))} '
+            f'{cumulative}'
+        )
+    yield f'{name}_sum{format_labels(labels)} {data[-1]}'
+    yield f'{name}_count{format_labels(labels)} {cumulative}'
+
+
+def render():
+    """Возвращает метрики всех процессов в текстовом формате Prometheus."""
+    counters, gauges, histograms = merge(collect())
+    values = {**counters, **gauges}
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        for (metric, labels), value in sorted(values.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+        for (metric, labels), data in sorted(histograms.items()):
+            if metric == name:
+                lines.extend(render_histogram(name, labels, data))
+    return '\n'.join(lines) + '\n'
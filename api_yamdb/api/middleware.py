@@ -0,0 +1,124 @@
+"""Учёт SQL-запросов, времени работы БД и метрик HTTP-запросов."""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from api import metrics
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+QUERY_TIME_HEADER = 'X-DB-Time'
+
+UNRESOLVED_LABELS = (('view', 'unresolved'), ('action', 'unresolved'))
+
+logger = logging.getLogger('api.queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Вьюсет выполнил больше SQL-запросов, чем заявлено в бюджете."""
+
+
+class QueryStats:
+    """Обёртка execute_wrapper: считает запросы и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def get_view_action(view_func, method):
+    """Действие вьюсета для метода запроса или сам метод для APIView."""
+    actions = getattr(view_func, 'actions', None) or {}
+    return actions.get(method.lower(), method.lower())
+
+
+def get_query_budget(view_func, method):
+    """
+    Возвращает бюджет запросов для вьюсета из атрибута query_budget:
+    число для всех действий или словарь {действие: число}.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    budget = getattr(view_class, 'query_budget', None)
+    if not isinstance(budget, dict):
+        return budget
+    return budget.get(get_view_action(view_func, method))
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает SQL-запросы и время БД за запрос. В режиме DEBUG добавляет
+    их в заголовки ответа. При превышении бюджета вьюсета пишет
+    предупреждение или, если QUERY_BUDGET_RAISE, бросает исключение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        request.query_stats = stats
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        if settings.DEBUG:
+            response[QUERY_COUNT_HEADER] = stats.count
+            response[QUERY_TIME_HEADER] = f'{stats.duration * 1000:.2f}'
+        self.check_budget(request, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+    def check_budget(self, request, stats):
+        budget = getattr(request, 'query_budget', None)
+        if budget is None or stats.count <= budget:
+            return
+        message = (
+            f'{request.method} {request.path}: {stats.count} SQL-запросов '
+            f'при бюджете {budget}.'
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class MetricsMiddleware:
+    """
+    Считает запросы, их длительность и работу БД по вьюсетам и действиям.
+    Должен стоять выше QueryBudgetMiddleware, который считает SQL-запросы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        labels = getattr(request, 'metrics_labels', UNRESOLVED_LABELS)
+        metrics.inc(metrics.REQUESTS, labels + (
+            ('method', request.method), ('status', response.status_code)
+        ))
+        metrics.observe(
+            metrics.REQUEST_DURATION, time.perf_counter() - started, labels
+        )
+        stats = getattr(request, 'query_stats', None)
+        if stats is not None:
+            metrics.inc(metrics.DB_QUERIES, labels, stats.count)
+            metrics.observe(metrics.DB_DURATION, stats.duration, labels)
+        metrics.flush_if_due()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        request.metrics_labels = (
+            ('view', getattr(view_class, '__name__', view_func.__name__)),
+            ('action', get_view_action(view_func, request.method)),
+        )
@@ -1,15 +1,125 @@
 """Модуль Миксинов"""
 
+from django.conf import settings
+from django.db.models import Q
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework.mixins import (
     ListModelMixin, CreateModelMixin, DestroyModelMixin,
 )
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import serializers, filters
+from rest_framework import serializers, filters, status
 
+from api import cache
+from api.pagination import KeysetPagination
 from api.permissions import IsAdminOrReadOnly
 from reviews.models import User
 
 
+class CacheResourcesMixin:
+    """
+    Ресурсы, от версий которых зависит ответ: cache_resources или, если
+    они зависят от URL, результат get_cache_resources.
+    """
+    cache_resources = ()
+
+    def get_cache_resources(self):
+        return self.cache_resources
+
+
+class CachedResponseMixin(CacheResourcesMixin):
+    """
+    Миксин кэширования ответов на получение списка. Ключ зависит от пути,
+    параметров запроса и версий ресурсов из get_cache_resources.
+    """
+
+    def list(self, request, *args, **kwargs):
+        api_cache = cache.get_cache()
+        key = cache.make_response_key(request, self.get_cache_resources())
+        data = api_cache.get(key)
+        if data is not None:
+            cache.record(cache.HITS)
+            return Response(data)
+        cache.record(cache.MISSES)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            api_cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Не изменено.'
+
+
+class ConditionalGetMixin(CacheResourcesMixin):
+    """
+    Миксин условных GET-запросов списка и объекта. ETag и Last-Modified
+    вычисляются по версиям get_cache_resources до выполнения запроса,
+    при совпадении с заголовками клиента возвращается ответ 304. Если
+    клиент прислал If-None-Match, If-Modified-Since не учитывается.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if (request.method != 'GET'
+                or self.action not in self.conditional_actions):
+            return
+        self.etag, self.last_modified, version = cache.make_etag(
+            request, self.get_cache_resources()
+        )
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            tags = {
+                tag.strip()[2:] if tag.strip().startswith('W/')
+                else tag.strip()
+                for tag in if_none_match.split(',')
+            }
+            if '*' in tags:
+                self.check_exists()
+                raise NotModified
+            if self.etag in tags:
+                raise NotModified
+            return
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        if (if_modified_since is not None
+                and version <= if_modified_since * 10 ** 9):
+            raise NotModified
+
+    def check_exists(self):
+        """
+        If-None-Match: * совпадает только с существующим ресурсом: для
+        отсутствующего объекта или родителя вложенного списка - 404.
+        """
+        if self.action == 'retrieve':
+            self.get_object()
+        else:
+            self.get_queryset()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, 'etag', None) and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+
 class ListCreateDeleteViewSet(
     ListModelMixin, CreateModelMixin, DestroyModelMixin, GenericViewSet,
 ):
@@ -19,6 +129,25 @@ class ListCreateDeleteViewSet(
     search_fields = ('name', 'slug')
 
 
+class SelectablePaginationMixin:
+    """
+    Миксин выбора пагинации: по умолчанию постраничная, при параметре
+    ?pagination=cursor или переданном курсоре - по ключу.
+    """
+    cursor_pagination_class = KeysetPagination
+    pagination_mode_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            cursor_class = self.cursor_pagination_class
+            if (params.get(self.pagination_mode_param) == 'cursor'
+                    or cursor_class.cursor_query_param in params):
+                self._paginator = cursor_class()
+        return super().paginator
+
+
 class UserValidationMixin:
     """Миксин с валидацией имени пользователя и email."""
 
@@ -29,20 +158,23 @@ class UserValidationMixin:
 
     def validate(self, data):
         """Проверяет уникальность username/email, но позволяет повторение
-        только если они принадлежат одному и тому же пользователю."""
+        только если они принадлежат одному и тому же пользователю.
+        Оба конфликта ищутся одним запросом только по нужным колонкам."""
         email = data.get('email')
         username = data.get('username')
 
         if email and username:
-            user_with_email = User.objects.filter(email=email).first()
-            user_with_username = User.objects.filter(username=username).first()
-
-            if user_with_email and user_with_email.username != username:
+            matches = list(
+                User.objects.filter(Q(email=email) | Q(username=username))
+                .values_list('username', 'email')[:2]
+            )
+            if any(match == (username, email) for match in matches):
+                return data
+            if any(match_email == email for _, match_email in matches):
                 raise serializers.ValidationError(
                     'Данный email уже используется другим пользователем.'
                 )
-
-            if user_with_username and user_with_username.email != email:
+            if matches:
                 raise serializers.ValidationError(
                     'Email не соответствует данным пользователя.',
                 )
@@ -32,3 +32,11 @@ class IsAuthorOrModeratorOrAdmin(BasePermission):
                 or request.user.is_admin
             )
         )
+
+
+class IsModeratorOrAdmin(BasePermission):
+    """Права доступа только модератору и администратору."""
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_moderator or request.user.is_admin
+        )
@@ -3,6 +3,8 @@ from django.conf import settings
 
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework_simplejwt.tokens import AccessToken
 
 from reviews.models import User, Genre, Category, Title, Review, Comment
 from .mixins import UserValidationMixin
@@ -109,19 +111,28 @@ class TokenObtainSerializer(serializers.Serializer):
 
     def validate(self, data):
         """
-        Проверяет существует ли пользователь с именем username и кодом
-        подтверждения confirmation_code.
+        Находит пользователя одним запросом по индексу username, проверяет
+        код подтверждения и гасит его, чтобы код нельзя было использовать
+        повторно.
         """
-        username = data.get('username')
-        code = data.get('confirmation_code')
-
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Пользователь не найден.')
+        user = User.objects.filter(username=data['username']).only(
+            'id', 'confirmation_code', 'confirmation_code_expires_at'
+        ).first()
+        if user is None:
+            raise NotFound('Пользователь не найден.')
+
+        if not (
+            user.check_confirmation_code(data['confirmation_code'])
+            and user.consume_confirmation_code()
+        ):
+            raise serializers.ValidationError(
+                'Неверный или просроченный код подтверждения.'
+            )
+        data['user'] = user
+        return data
 
-        if user.confirmation_code != code:
-            raise serializers.ValidationError('Неверный код подтверждения.')
+    def to_representation(self, instance):
+        return {'token': str(AccessToken.for_user(instance['user']))}
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -152,6 +163,14 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
+class LeaderboardSerializer(TitleReadSerializer):
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + (
+            'weighted_rating', 'rating_count'
+        )
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         many=True,
@@ -0,0 +1,72 @@
+"""Сигналы смены версий ресурсов API для кэша и условных запросов."""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import forget_user
+from api.cache import BULK, bump_versions, scoped
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_changed
+
+RESOURCES = {
+    Title: 'title',
+    Genre: 'genre',
+    Category: 'category',
+    Review: 'review',
+    Comment: 'comment',
+    User: 'user',
+}
+
+
+# Вложенные ресурсы: их версия ведётся и для каждого родителя, чтобы
+# отзыв к одному произведению не сбрасывал ETag отзывов к остальным.
+PARENTS = {
+    Review: ('title', 'title_id'),
+    Comment: ('review', 'review_id'),
+}
+
+
+def invalidate_on_change(sender, instance, **kwargs):
+    """После фиксации транзакции меняет версию изменённого ресурса."""
+    resources = [RESOURCES[sender]]
+    if sender in PARENTS:
+        parent, attname = PARENTS[sender]
+        resources.append(scoped(
+            RESOURCES[sender], parent, getattr(instance, attname)
+        ))
+    transaction.on_commit(partial(bump_versions, *resources))
+
+
+for model in RESOURCES:
+    post_save.connect(invalidate_on_change, sender=model)
+    post_delete.connect(invalidate_on_change, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_on_genre_change(sender, action, **kwargs):
+    """Меняет версию произведений при изменении их жанров."""
+    if action.startswith('post_'):
+        transaction.on_commit(partial(bump_versions, 'title'))
+
+
+@receiver(bulk_changed)
+def invalidate_on_bulk_change(sender, models, **kwargs):
+    """Меняет версии ресурсов после массовой загрузки данных."""
+    resources = {RESOURCES[model] for model in models if model in RESOURCES}
+    if Title.genre.through in models:
+        resources.add('title')
+    if Review in models:
+        resources.add('title')
+    if Review in models or Comment in models:
+        resources.add(BULK)
+    if resources:
+        transaction.on_commit(partial(bump_versions, *resources))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    """Сбрасывает кэш аутентификации изменённого пользователя."""
+    transaction.on_commit(partial(forget_user, instance.pk))
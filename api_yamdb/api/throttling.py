@@ -0,0 +1,149 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket.
+
+Корзина ёмкостью N пополняется на N жетонов за период, каждый запрос
+забирает один жетон. Частоты задаются в DEFAULT_THROTTLE_RATES как у
+DRF ('5/hour'), ключ - '<throttle_scope вью>_<вид ключа>'. Проверка
+выполняется за O(1) и не обращается к БД.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+BUCKET_KEY = 'throttle:{}'
+
+
+def parse_rate(rate):
+    """Преобразует '5/hour' в (ёмкость, жетонов в секунду)."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take_token(state, capacity, refill_rate, now):
+    """
+    Пополняет корзину за прошедшее время и забирает жетон. Возвращает
+    новое состояние и сколько секунд ждать, если жетонов нет.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill_rate
+
+
+class LocalBucketStore:
+    """
+    Корзины в памяти процесса. При нескольких воркерах лимит действует
+    в каждом из них отдельно. Давно не использованные корзины вытесняются.
+    """
+
+    def __init__(self, max_size=100_000):
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+        self.max_size = max_size
+
+    def consume(self, key, capacity, refill_rate):
+        with self.lock:
+            state, wait = take_token(
+                self.buckets.pop(key, None), capacity, refill_rate,
+                time.monotonic()
+            )
+            self.buckets[key] = state
+            if len(self.buckets) > self.max_size:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Корзины в общем кэше, один лимит на все воркеры. Чтение и запись не
+    атомарны, поэтому при гонке может пройти на несколько запросов больше.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def consume(self, key, capacity, refill_rate):
+        cache = caches[self.alias]
+        key = BUCKET_KEY.format(key)
+        state, wait = take_token(
+            cache.get(key), capacity, refill_rate, time.time()
+        )
+        cache.set(key, state, timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+
+local_store = LocalBucketStore()
+
+
+def get_store():
+    if settings.THROTTLE_STORE == 'cache':
+        return CacheBucketStore(settings.THROTTLE_CACHE_ALIAS)
+    return local_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый класс: подклассы задают вид ключа kind и поле тела запроса
+    key_field, по которому считается лимит; без него - IP-адрес клиента.
+    """
+    kind = None
+    key_field = None
+
+    def get_key(self, request, view):
+        if self.key_field is None:
+            return self.get_ident(request)
+        if not isinstance(request.data, Mapping):
+            # Тело не объект: запрос отклонит валидация, лимит по IP
+            # действует и без этого ключа.
+            return None
+        return str(request.data.get(self.key_field, '')).strip().lower()
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(
+            f'{getattr(view, "throttle_scope", None)}_{self.kind}'
+        )
+        key = self.get_key(request, view) if rate else None
+        if not key:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        wait = get_store().consume(
+            f'{view.throttle_scope}:{self.kind}:{key}', capacity, refill_rate
+        )
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Лимит на IP-адрес клиента."""
+    kind = 'ip'
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Лимит на имя пользователя из тела запроса."""
+    kind = 'username'
+    key_field = 'username'
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """Лимит на email из тела запроса."""
+    kind = 'email'
+    key_field = 'email'
@@ -3,9 +3,10 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
-    SignupView, TokenObtainView, UserViewSet,
+    SignupView, TokenObtainView, UserViewSet, ExportView, AutocompleteView,
     GenreViewSet, CategoryViewSet, TitleViewSet,
-    ReviewViewSet, CommentViewSet
+    ReviewViewSet, CommentViewSet, ReviewSearchViewSet, CommentSearchViewSet,
+    LeaderboardViewSet
 )
 
 router = DefaultRouter()
@@ -13,14 +14,21 @@ router.register('users', UserViewSet, basename='users')
 router.register('genres', GenreViewSet, basename='genres')
 router.register('categories', CategoryViewSet, basename='categories')
 router.register('titles', TitleViewSet, basename='titles')
+router.register('leaderboards', LeaderboardViewSet, basename='leaderboards')
 router.register(r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet,
                 basename='reviews')
 router.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentViewSet, basename='comments')
+router.register('search/reviews', ReviewSearchViewSet,
+                basename='search-reviews')
+router.register('search/comments', CommentSearchViewSet,
+                basename='search-comments')
 
 urlpatterns = [
     path('auth/signup/', SignupView.as_view(), name='signup'),
     path('auth/token/', TokenObtainView.as_view(), name='token_obtain'),
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path('export/<slug:name>/', ExportView.as_view(), name='export'),
     path('', include(router.urls)),
 ]
@@ -1,15 +1,42 @@
-from django.core.mail import send_mail
 from django.conf import settings
+from django.core.mail import EmailMessage
+from rest_framework.exceptions import ValidationError
+
+from api.mail import mailer
+from reviews.models import OutgoingEmail
 
 
 def send_confirmation_email(user):
-    """Отправляет письмо с кодом подтверждения на email пользователя."""
+    """
+    Ставит письмо с кодом подтверждения в очередь на отправку или, если
+    очередь отключена (EMAIL_OUTBOX), сразу отправляет его.
+    """
     subject = 'Код подтверждения регистрации'
     message = (
         f"""Здравствуйте, {user.username},\n
         Ваш код подтвержения регистрации: {user.confirmation_code}""")
+    if settings.EMAIL_OUTBOX:
+        OutgoingEmail.objects.create(
+            recipient=user.email, subject=subject, body=message
+        )
+        return
+
     from_email = settings.DEFAULT_FROM_EMAIL
     recipient_list = [user.email]
 
-    send_mail(subject, message, from_email, recipient_list,
-              fail_silently=False)
+    error, = mailer.send(
+        [EmailMessage(subject, message, from_email, recipient_list)]
+    )
+    if error is not None:
+        raise error
+
+
+def get_limit(request, default, maximum):
+    """Читает параметр limit запроса: целое число от 1 до maximum."""
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= maximum:
+        raise ValidationError({'limit': f'Число от 1 до {maximum}.'})
+    return limit
@@ -1,28 +1,43 @@
 """Модуль вьюсетов."""
-from django.db.models import Avg
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
+from django.http import (
+    HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+)
+from django.db import IntegrityError
 from django.shortcuts import get_object_or_404
 
-from rest_framework import permissions, status, viewsets, filters
+from rest_framework import mixins, permissions, status, viewsets, filters
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.views import APIView
 
-from api.filters import TitleFilter
-from api.mixins import ListCreateDeleteViewSet
+from api import cache, metrics
+from api.autocomplete import KINDS, autocomplete
+from api.filters import (
+    CommentSearchFilter, LeaderboardFilter, ReviewSearchFilter, TitleFilter
+)
+from api.mixins import (
+    CachedResponseMixin, ConditionalGetMixin, ListCreateDeleteViewSet,
+    SelectablePaginationMixin
+)
 from api.permissions import (
-    IsAdminOrReadOnly, IsAdmin, IsAuthorOrModeratorOrAdmin
+    IsAdminOrReadOnly, IsAdmin, IsAuthorOrModeratorOrAdmin,
+    IsModeratorOrAdmin
 )
 from api.serializers import (
     SignupSerializer, TokenObtainSerializer, UserSerializer,
     GenreSerializer, CategorySerializer,
-    TitleReadSerializer, TitleWriteSerializer,
+    TitleReadSerializer, TitleWriteSerializer, LeaderboardSerializer,
     ReviewSerializer, CommentSerializer
 )
-from api.utils import send_confirmation_email
-from reviews.models import User, Genre, Category, Title, Comment, Review
+from api.throttling import EmailThrottle, IPThrottle, UsernameThrottle
+from api.utils import get_limit, send_confirmation_email
+from reviews.export import EXPORTS, CONTENT_TYPES, NDJSON, stream_export
+from reviews.models import User, Genre, Category, Title, Review, Comment
 
 
 class SignupView(APIView):
@@ -32,6 +47,9 @@ class SignupView(APIView):
     """
 
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle, EmailThrottle)
+    throttle_scope = 'signup'
+    query_budget = 6
 
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
@@ -39,10 +57,23 @@ class SignupView(APIView):
             username = serializer.validated_data['username']
             email = serializer.validated_data['email']
 
-            user, _ = User.objects.get_or_create(
-                username=username,
-                defaults={'email': email}
-            )
+            # Между проверкой и созданием пользователя параллельный запрос
+            # мог занять username или email: get_or_create вернёт уже
+            # созданного, а чужой email даст IntegrityError.
+            try:
+                user, _ = User.objects.get_or_create(
+                    username=username,
+                    defaults={'email': email}
+                )
+            except IntegrityError:
+                user = None
+            if user is None or user.email != email:
+                return Response(
+                    {'non_field_errors': [
+                        'Данный email уже используется другим пользователем.'
+                    ]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             user.set_confirmation_code()
             send_confirmation_email(user)
@@ -60,25 +91,17 @@ class TokenObtainView(APIView):
     """
 
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
+    query_budget = 2
 
-    def post(self, request, *args, **kwargs):
-        username = request.data.get('username')
-        if not username:
-            return Response('username - необходимое поле.',
-                            status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            User.objects.get(username=username)
-        except User.DoesNotExist:
-            return Response('Пользователь не найден.',
-                            status=status.HTTP_404_NOT_FOUND)
-
-        data = TokenObtainSerializer(data=request.data)
-        if not data.is_valid():
-            return Response(status=status.HTTP_400_BAD_REQUEST)
+    def post(self, request):
+        serializer = TokenObtainSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления объектами пользователя. Ендпоинты:
     - /users/ [GET, POST]
@@ -86,6 +109,12 @@ class UserViewSet(viewsets.ModelViewSet):
     - /users/me/ [GET, PATCH]
     """
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cache_resources = ('user',)
+    # Удаление пользователя не ограничено: каскад пересчитывает рейтинг
+    # каждого произведения, на которое он оставил отзыв.
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'me': 3, 'create': 4, 'partial_update': 3,
+    }
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'username'
@@ -101,13 +130,14 @@ class UserViewSet(viewsets.ModelViewSet):
         Аутентифицированный пользователь может изменять и просматривать
         только свои данные.
         """
+        # request.user из кэша аутентификации содержит не все поля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            user = self.get_serializer(request.user)
-            return Response(user.data)
+            return Response(self.get_serializer(user).data)
 
         elif request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             if serializer.is_valid():
                 serializer.save()
@@ -115,23 +145,35 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
-class GenreViewSet(ListCreateDeleteViewSet):
+class GenreViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   ListCreateDeleteViewSet):
     """Вьюсет модели Жанров."""
+    cache_resources = ('genre',)
+    query_budget = {'list': 3, 'create': 3, 'destroy': 5}
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class CategoryViewSet(ListCreateDeleteViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin,
+                      ListCreateDeleteViewSet):
     """Вьюсет модели Категорий."""
+    cache_resources = ('category',)
+    query_budget = {'list': 3, 'create': 3, 'destroy': 5}
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
     """Вьюсет модели Произведений."""
+    cache_resources = ('title', 'genre', 'category', 'review')
+    # Удаление не ограничено: каскад удаляет отзывы по одному.
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 10, 'partial_update': 6,
+    }
     queryset = (
-        Title.objects.all()
-        .annotate(rating=Avg('reviews__score'))
+        Title.objects.select_related('category')
+        .prefetch_related('genre')
         .order_by('name')
     )
     permission_classes = (IsAdminOrReadOnly, )
@@ -145,14 +187,55 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleWriteSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class LeaderboardViewSet(ConditionalGetMixin, CachedResponseMixin,
+                         mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Лучшие произведения по взвешенному рейтингу: все или жанра или
+    категории (параметры genre, category и limit). Рейтинг хранится в
+    произведении и обновляется вместе с отзывами, поэтому список - это
+    чтение по индексу без агрегации отзывов.
+    """
+    cache_resources = ('title', 'genre', 'category', 'review')
+    query_budget = {'list': 2}
+    serializer_class = LeaderboardSerializer
+    permission_classes = (AllowAny,)
+    pagination_class = None
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = LeaderboardFilter
+
+    def get_queryset(self):
+        return (
+            Title.objects.leaderboard().select_related('category')
+            .prefetch_related('genre')
+        )
+
+    def filter_queryset(self, queryset):
+        limit = get_limit(
+            self.request, settings.LEADERBOARD_SIZE,
+            settings.LEADERBOARD_MAX_SIZE
+        )
+        return super().filter_queryset(queryset)[:limit]
+
+
+class ReviewViewSet(ConditionalGetMixin, SelectablePaginationMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для модели Отзывов."""
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 6, 'partial_update': 6,
+        'destroy': 7,
+    }
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrAdmin)
     pagination_class = PageNumberPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_cache_resources(self):
+        return (
+            cache.scoped('review', 'title', self.kwargs.get('title_id')),
+            cache.BULK, 'user',
+        )
+
     def get_title(self):
         """Возвращает объект Title по ID из URL или вызывает 404."""
         title_id = self.kwargs.get('title_id')
@@ -160,28 +243,130 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         title = self.get_title()
-        return Review.objects.filter(title=title)
+        return title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        """Произведение уже получено при валидации сериализатора."""
+        serializer.save(author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SelectablePaginationMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Комментариев."""
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 3, 'partial_update': 4,
+        'destroy': 5,
+    }
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrAdmin]
     pagination_class = PageNumberPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_cache_resources(self):
+        return (
+            cache.scoped('comment', 'review', self.kwargs.get('review_id')),
+            cache.BULK, 'user',
+        )
+
     def get_review(self):
-        """Возвращает title_id из URL параметров или вызывает исключение."""
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, pk=review_id)
+        """Возвращает отзыв по ID из URL параметров или вызывает 404."""
+        return get_object_or_404(
+            Review.objects.only('id', 'title_id'),
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
 
     def get_queryset(self):
-        return Comment.objects.filter(review=self.get_review())
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
+
+
+class TextSearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Поиск по тексту для модерации (параметр search) с фильтрами по
+    произведению, автору и дате. Доступен модератору и администратору.
+    """
+    query_budget = {'list': 3}
+    permission_classes = (IsModeratorOrAdmin,)
+    pagination_class = PageNumberPagination
+    filter_backends = (DjangoFilterBackend,)
+
+
+class ReviewSearchViewSet(TextSearchViewSet):
+    queryset = Review.objects.select_related('author').order_by(
+        '-pub_date', '-id'
+    )
+    serializer_class = ReviewSerializer
+    filterset_class = ReviewSearchFilter
+
+
+class CommentSearchViewSet(TextSearchViewSet):
+    queryset = Comment.objects.select_related('author').order_by(
+        '-pub_date', '-id'
+    )
+    serializer_class = CommentSerializer
+    filterset_class = CommentSearchFilter
+
+
+class AutocompleteView(APIView):
+    """
+    Подсказки по началу названия произведения, жанра или категории
+    (параметры q, type через запятую и limit).
+    """
+    permission_classes = (AllowAny,)
+    # Запросы к БД только при перестроении индекса после изменений.
+    query_budget = 3
+
+    def get(self, request):
+        kinds = request.query_params.get('type')
+        kinds = tuple(kinds.split(',')) if kinds else KINDS
+        if not set(kinds) <= set(KINDS):
+            raise ValidationError(
+                {'type': f'Допустимые типы: {", ".join(KINDS)}.'}
+            )
+        limit = get_limit(
+            request, settings.AUTOCOMPLETE_LIMIT,
+            settings.AUTOCOMPLETE_MAX_LIMIT
+        )
+        return Response(autocomplete.search(
+            request.query_params.get('q', ''), limit, kinds
+        ))
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов или комментариев в NDJSON
+    или CSV (параметр output). Доступна только администратору.
+    """
+    permission_classes = (IsAdmin,)
+    query_budget = 1
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            raise NotFound('Неизвестная выгрузка.')
+        output_format = request.query_params.get('output', NDJSON)
+        if output_format not in CONTENT_TYPES:
+            raise ValidationError(
+                {'output': f'Допустимые форматы: {", ".join(CONTENT_TYPES)}.'}
+            )
+        response = StreamingHttpResponse(
+            stream_export(name, output_format),
+            content_type=CONTENT_TYPES[output_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{output_format}"'
+        )
+        return response
+
+
+def metrics_view(request):
+    """
+    Отдаёт метрики в текстовом формате Prometheus клиентам из
+    METRICS_ALLOWED_IPS.
+    """
+    if not metrics.is_allowed(request.META.get('REMOTE_ADDR')):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -34,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -107,27 +109,113 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 AUTH_USER_MODEL = 'reviews.User'
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-
 load_dotenv()
 
+# Для разработки подойдут бэкенды locmem и filebased (с EMAIL_FILE_PATH).
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'
+)
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
+# Письма ставятся в очередь и отправляются командой run_mail_worker.
+EMAIL_OUTBOX = os.getenv('EMAIL_OUTBOX', 'True') == 'True'
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+EMAIL_CONNECTION_IDLE_TIMEOUT = float(
+    os.getenv('EMAIL_CONNECTION_IDLE_TIMEOUT', 30)
+)
+EMAIL_CONNECTION_MAX_MESSAGES = int(
+    os.getenv('EMAIL_CONNECTION_MAX_MESSAGES', 100)
+)
+
+# Cache
+
+# Локальный кэш у каждого процесса свой; при нескольких воркерах
+# API_CACHE_BACKEND следует указать на общий бэкенд (Memcached и т.п.).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api'),
+    },
+}
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+# Сколько секунд пользователь из JWT-токена берётся из кэша без запроса
+# к БД; ограничивает устаревание после массовой загрузки пользователей.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Leaderboards
+
+# Взвешенный рейтинг считается так, будто у каждого произведения есть ещё
+# RATING_PRIOR_COUNT оценок RATING_PRIOR_MEAN. После изменения значений
+# выполните recalculate_ratings.
+RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', 5.5))
+RATING_PRIOR_COUNT = int(os.getenv('RATING_PRIOR_COUNT', 5))
+# Сколько оценок нужно, чтобы попасть в рейтинг лучших.
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', 3))
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+
+# Autocomplete
+
+# Сколько подсказок отдавать по умолчанию и сколько можно запросить.
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Query budget
+
+# При превышении бюджета запросов вьюсета бросать исключение вместо
+# записи предупреждения в лог (включается в тестах).
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False') == 'True'
+
+# Metrics
+
+# При нескольких воркерах METRICS_DIR должен указывать на общий для них
+# каталог: каждый воркер сбрасывает туда снимок метрик раз в
+# METRICS_FLUSH_INTERVAL секунд, а /metrics суммирует снимки.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+# Адреса и подсети, которым доступен /metrics, через запятую; '*' -
+# всем. За обратным прокси здесь должен быть адрес прокси.
+METRICS_ALLOWED_IPS = [
+    address.strip() for address in os.getenv(
+        'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+    ).split(',')
+]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAuthenticated', ),
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend', ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', '30/hour'),
+        'signup_username': os.getenv('THROTTLE_SIGNUP_USERNAME', '5/hour'),
+        'signup_email': os.getenv('THROTTLE_SIGNUP_EMAIL', '5/hour'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', '60/hour'),
+        'token_username': os.getenv('THROTTLE_TOKEN_USERNAME', '10/hour'),
+    },
 }
 
+# Throttling
+
+# local - корзины в памяти процесса, cache - в кэше THROTTLE_CACHE_ALIAS,
+# общем для всех воркеров.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'local')
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'api')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -136,6 +224,9 @@ SIMPLE_JWT = {
 MAX_LENGTH = 254
 MAX_LENGTH_USERNAME = 150
 MAX_LENGTH_CODE = 10
+CONFIRMATION_CODE_LIFETIME = timedelta(
+    seconds=int(os.getenv('CONFIRMATION_CODE_LIFETIME', 24 * 60 * 60))
+)
 MAX_LENGTH_NAME = 256
 MAX_LENGTH_SLUG = 50
 MAX_LENGTH_BEGINNING_TEXT = 50
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
 
-from .models import User, Genre, Category, Title, Review, Comment
+from .models import (
+    User, Genre, Category, Title, Review, Comment, OutgoingEmail
+)
 
 
 @admin.register(User)
@@ -10,22 +13,47 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ('role', 'is_staff', 'is_superuser')
 
 
+class TextSearchMixin:
+    """
+    Ищет по тексту через полнотекстовый индекс, а не LIKE по search_fields,
+    и по точному имени автора.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = queryset.model.objects.search(search_term).values('pk')
+        return queryset.filter(
+            Q(pk__in=found) | Q(author__username=search_term)
+        ), False
+
+
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(TextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'text', 'score', 'author', 'pub_date')
     list_filter = ('title', 'author', 'score', 'pub_date')
-    search_fields = ('text', 'author__username', 'title__name')
+    search_fields = ('text', 'author__username')
     date_hierarchy = 'pub_date'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(TextSearchMixin, admin.ModelAdmin):
     list_display = ('review', 'text', 'author', 'pub_date')
     list_filter = ('review', 'author', 'pub_date')
-    search_fields = ('text', 'author__username', 'review__title__name')
+    search_fields = ('text', 'author__username')
     date_hierarchy = 'pub_date'
 
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient', 'subject', 'status', 'attempts', 'next_attempt_at'
+    )
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+
+
 admin.site.register(Genre)
 admin.site.register(Category)
 admin.site.register(Title)
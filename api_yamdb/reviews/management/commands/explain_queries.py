@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы (EXPLAIN) и время основных запросов API. '
+        'Для сравнения запустите до и после миграции с индексами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов каждого запроса.'
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=10,
+            help='Размер страницы выборки.'
+        )
+
+    def handle(self, *args, **options):
+        patterns = self.get_patterns(options['page_size'])
+        for name, queryset in patterns:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain())
+            timings = self.measure(queryset, options['repeat'])
+            self.stdout.write(
+                f'p50 {statistics.median(timings):.3f} мс, '
+                f'max {max(timings):.3f} мс\n'
+            )
+
+    def get_patterns(self, page_size):
+        review = (
+            Review.objects.annotate(total=Count('comments'))
+            .order_by('-total').only('id', 'title_id').first()
+        )
+        title = (
+            Title.objects.order_by('-rating_count').only('id', 'year').first()
+        )
+        category = Category.objects.first()
+        genre = Genre.objects.first()
+        if not all((review, title, category, genre)):
+            raise CommandError(
+                'Недостаточно данных: загрузите их командой import_csv '
+                'или generate_data.'
+            )
+        year = title.year
+        return (
+            ('Отзывы произведения', Review.objects.filter(
+                title_id=title.pk
+            ).order_by('-pub_date', '-id')[:page_size]),
+            ('Комментарии к отзыву', Comment.objects.filter(
+                review_id=review.pk
+            ).order_by('-pub_date', '-id')[:page_size]),
+            ('Произведения категории', Title.objects.filter(
+                category__slug=category.slug
+            ).order_by('name')[:page_size]),
+            ('Произведения жанра', Title.objects.filter(
+                genre__slug=genre.slug
+            ).order_by('name')[:page_size]),
+            ('Произведения года', Title.objects.filter(
+                year=year
+            ).order_by('name')[:page_size]),
+        )
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, OutputWrapper
+
+from reviews.export import (
+    DEFAULT_CHUNK_SIZE, EXPORTS, HEADER_LINES, NDJSON, RENDERERS,
+    stream_export
+)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает произведения, отзывы или комментарии в NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=EXPORTS)
+        parser.add_argument(
+            '--output-format', choices=RENDERERS, default=NDJSON,
+            help='Формат выгрузки.'
+        )
+        parser.add_argument(
+            '--file', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за раз.'
+        )
+
+    def handle(self, *args, **options):
+        lines = stream_export(
+            options['name'], options['output_format'], options['chunk_size']
+        )
+        started = time.perf_counter()
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8',
+                      newline='') as output:
+                rows = self.write(OutputWrapper(output), lines)
+        else:
+            rows = self.write(self.stdout, lines)
+        rows = max(rows - HEADER_LINES[options['output_format']], 0)
+        self.stderr.write(
+            f'Выгружено строк: {rows} за '
+            f'{time.perf_counter() - started:.2f} с.'
+        )
+
+    def write(self, output, lines):
+        """Пишет строки выгрузки и возвращает их число с заголовком."""
+        rows = 0
+        for rows, line in enumerate(lines, 1):
+            output.write(line, ending='')
+        return rows
@@ -0,0 +1,230 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_changed
+from reviews.utils import keep_dates
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'актёр', 'режиссёр',
+    'музыка', 'атмосфера', 'история', 'диалоги', 'смысл', 'образ', 'сцена',
+    'отлично', 'скучно', 'неожиданно', 'трогательно', 'затянуто', 'смешно',
+    'страшно', 'красиво', 'слабо', 'гениально', 'наивно', 'сильно', 'мрачно',
+    'светло', 'рекомендую', 'пересматривать', 'перечитывать', 'автор',
+    'персонаж', 'роман', 'песня', 'альбом', 'картина', 'эпизод', 'глава',
+)
+DATE_SPAN = timedelta(days=5 * 365)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные для нагрузочного тестирования: '
+        'популярность произведений и отзывов распределена по Ципфу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument('--reviews', type=int, default=50000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения популярности.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Зерно генератора для воспроизводимых данных.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Префикс имён создаваемых объектов.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['categories'], options['genres'],
+               options['titles']) < 1:
+            raise CommandError(
+                'Нужны хотя бы один пользователь, категория, жанр и '
+                'произведение.'
+            )
+        if User.objects.filter(
+            username__startswith=f'{options["prefix"]}_user'
+        ).exists():
+            raise CommandError(
+                f'Данные с префиксом {options["prefix"]} уже созданы, '
+                'укажите другой --prefix.'
+            )
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        self.now = timezone.now()
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            users = self.step('Пользователи', self.create_users,
+                              options['users'])
+            categories = self.step('Категории', self.create_named, Category,
+                                   options['categories'])
+            genres = self.step('Жанры', self.create_named, Genre,
+                               options['genres'])
+            titles = self.step('Произведения', self.create_titles,
+                               options['titles'], categories, genres)
+            reviews = self.step('Отзывы', self.create_reviews,
+                                options['reviews'], titles, users,
+                                options['zipf'])
+            self.step('Комментарии', self.create_comments,
+                      options['comments'], reviews, users, options['zipf'])
+            # Диапазон, а не список id: число параметров запроса не
+            # зависит от --titles. Пересчёт попавших в него старых
+            # произведений безвреден.
+            Title.objects.filter(
+                pk__range=(min(titles), max(titles))
+            ).recalculate_rating()
+
+        bulk_changed.send(sender=self.__class__, models=[
+            User, Category, Genre, Title, Title.genre.through, Review, Comment
+        ])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с.'
+        ))
+
+    def step(self, name, create, *args):
+        started = time.perf_counter()
+        ids = create(*args)
+        elapsed = time.perf_counter() - started
+        speed = len(ids) / elapsed if elapsed else len(ids)
+        self.stdout.write(
+            f'{name}: {len(ids)} за {elapsed:.2f} с ({speed:.0f} строк/с)'
+        )
+        return ids
+
+    def bulk_create(self, model, objects):
+        """
+        Вставляет объекты пакетами по мере генерации и возвращает
+        id созданных записей.
+        """
+        last_id = model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        batch = []
+        with keep_dates(model):
+            for obj in objects:
+                batch.append(obj)
+                if len(batch) == self.batch_size:
+                    model.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_create(batch)
+        return list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def zipf_weights(self, count, exponent):
+        """Накопленные веса Ципфа для случайно переставленных объектов."""
+        ranks = list(range(1, count + 1))
+        self.rng.shuffle(ranks)
+        return list(accumulate(1 / rank ** exponent for rank in ranks))
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize() + '.'
+
+    def pub_date(self):
+        return self.now - DATE_SPAN * self.rng.random()
+
+    def create_users(self, count):
+        password = make_password(None)
+        return self.bulk_create(User, (
+            User(
+                username=f'{self.prefix}_user{idx}',
+                email=f'{self.prefix}_user{idx}@yamdb.fake',
+                password=password,
+            )
+            for idx in range(count)
+        ))
+
+    def create_named(self, model, count):
+        name = model.__name__.lower()
+        return self.bulk_create(model, (
+            model(
+                name=f'{self.prefix} {name} {idx}',
+                slug=f'{self.prefix}-{name}-{idx}'
+            )
+            for idx in range(count)
+        ))
+
+    def create_titles(self, count, categories, genres):
+        titles = self.bulk_create(Title, (
+            Title(
+                name=f'{self.prefix} {self.text(2)[:-1]} {idx}',
+                year=self.rng.randint(1900, self.now.year),
+                description=self.text(self.rng.randint(5, 30)),
+                category_id=self.rng.choice(categories),
+            )
+            for idx in range(count)
+        ))
+        through = Title.genre.through
+        self.bulk_create(through, (
+            through(title_id=title_id, genre_id=genre_id)
+            for title_id in titles
+            for genre_id in self.rng.sample(
+                genres, self.rng.randint(1, min(3, len(genres)))
+            )
+        ))
+        return titles
+
+    def create_reviews(self, count, titles, users, exponent):
+        """
+        Распределяет отзывы по произведениям по Ципфу; авторы отзывов
+        на одно произведение различны, как требует unique_together.
+        """
+        per_title = dict.fromkeys(titles, 0)
+        weights = self.zipf_weights(len(titles), exponent)
+        remaining = min(count, len(titles) * len(users))
+        while remaining:
+            for title_id in self.rng.choices(
+                titles, cum_weights=weights, k=remaining
+            ):
+                per_title[title_id] += 1
+            remaining = 0
+            for title_id, total in per_title.items():
+                if total > len(users):
+                    remaining += total - len(users)
+                    per_title[title_id] = len(users)
+        return self.bulk_create(Review, (
+            Review(
+                title_id=title_id,
+                author_id=author_id,
+                text=self.text(self.rng.randint(5, 60)),
+                score=min(10, max(1, round(self.rng.gauss(7, 2)))),
+                pub_date=self.pub_date(),
+            )
+            for title_id, total in per_title.items() if total
+            for author_id in self.rng.sample(users, min(total, len(users)))
+        ))
+
+    def create_comments(self, count, reviews, users, exponent):
+        if not reviews:
+            return []
+        review_ids = self.rng.choices(
+            reviews, cum_weights=self.zipf_weights(len(reviews), exponent),
+            k=count
+        )
+        return self.bulk_create(Comment, (
+            Comment(
+                review_id=review_id,
+                author_id=self.rng.choice(users),
+                text=self.text(self.rng.randint(3, 30)),
+                pub_date=self.pub_date(),
+            )
+            for review_id in review_ids
+        ))
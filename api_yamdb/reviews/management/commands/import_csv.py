@@ -0,0 +1,144 @@
+import csv
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_changed
+from reviews.utils import keep_dates
+
+# Файлы в порядке зависимостей и переименование колонок внешних ключей.
+TABLES = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': 'category_id'}),
+    ('genre_title.csv', Title.genre.through, {}),
+    ('review.csv', Review, {'author': 'author_id'}),
+    ('comments.csv', Comment, {'author': 'author_id'}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=str(settings.BASE_DIR / 'static' / 'data'),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Обновлять существующие записи вместо их пропуска.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным.')
+
+        total_rows = total_created = 0
+        started = time.perf_counter()
+        imported = []
+        for filename, model, renames in TABLES:
+            file_path = path / filename
+            if not file_path.exists():
+                self.stdout.write(f'{filename}: файл не найден, пропущен.')
+                continue
+            file_started = time.perf_counter()
+            with transaction.atomic(), keep_dates(model):
+                rows, created = self.import_file(
+                    file_path, model, renames,
+                    options['batch_size'], options['update']
+                )
+            imported.append(model)
+            total_rows += rows
+            total_created += created
+            self.stdout.write(self.format_report(
+                filename, rows, created, options['update'],
+                time.perf_counter() - file_started
+            ))
+
+        self.reset_sequences(imported)
+        Title.objects.recalculate_rating()
+        bulk_changed.send(sender=self.__class__, models=imported)
+        self.stdout.write(self.style.SUCCESS(self.format_report(
+            'Итого', total_rows, total_created, options['update'],
+            time.perf_counter() - started
+        )))
+
+    def import_file(self, file_path, model, renames, batch_size, update):
+        """
+        Возвращает число прочитанных строк и число созданных записей:
+        bulk_create(ignore_conflicts=True) не сообщает, что пропустил.
+        """
+        rows, count = 0, model.objects.count()
+        with open(file_path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            columns = [renames.get(name, name) for name in reader.fieldnames]
+            fields = [model._meta.get_field(name) for name in columns]
+            batch = []
+            for row in reader:
+                batch.append(self.build_object(model, fields, row.values()))
+                rows += 1
+                if len(batch) == batch_size:
+                    self.save_batch(model, batch, fields, update)
+                    batch = []
+            if batch:
+                self.save_batch(model, batch, fields, update)
+        return rows, model.objects.count() - count
+
+    def build_object(self, model, fields, values):
+        data = {}
+        for field, value in zip(fields, values):
+            if value == '' and field.null:
+                value = None
+            data[field.attname] = field.to_python(value)
+        if model is User:
+            data.setdefault('password', make_password(None))
+        return model(**data)
+
+    def save_batch(self, model, batch, fields, update):
+        if not update:
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            return
+        existing = set(model.objects.filter(
+            pk__in=[obj.pk for obj in batch]
+        ).values_list('pk', flat=True))
+        model.objects.bulk_create(
+            [obj for obj in batch if obj.pk not in existing]
+        )
+        update_fields = [
+            field.name for field in fields if not field.primary_key
+        ]
+        if existing and update_fields:
+            model.objects.bulk_update(
+                [obj for obj in batch if obj.pk in existing], update_fields
+            )
+
+    def reset_sequences(self, models):
+        """Сдвигает счётчики первичных ключей после вставки явных id."""
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def format_report(self, name, rows, created, update, elapsed):
+        speed = rows / elapsed if elapsed else rows
+        rest = 'обновлено' if update else 'пропущено'
+        return (
+            f'{name}: {rows} строк, создано {created}, {rest} '
+            f'{rows - created} за {elapsed:.2f} с ({speed:.0f} строк/с)'
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reviews.models import User
+
+
+class Command(BaseCommand):
+    help = 'Удаляет просроченные коды подтверждения пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество пользователей, обновляемых одним запросом.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным.')
+        now = timezone.now()
+        expired = User.objects.filter(confirmation_code_expires_at__lte=now)
+        purged = 0
+        while True:
+            ids = list(
+                expired.order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            purged += User.objects.filter(pk__in=ids).update(
+                confirmation_code='', confirmation_code_expires_at=None
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено просроченных кодов подтверждения: {purged}.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает хранимый и взвешенный рейтинги всех произведений по '
+        'отзывам.'
+    )
+
+    def handle(self, *args, **options):
+        updated = Title.objects.recalculate_rating()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для произведений: {updated}.'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 18:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_expiry(apps, schema_editor):
+    """Уже выданные коды действуют полный срок с момента миграции."""
+    User = apps.get_model('reviews', 'User')
+    User.objects.exclude(confirmation_code='').update(
+        confirmation_code_expires_at=(
+            timezone.now() + settings.CONFIRMATION_CODE_LIFETIME
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_code_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Confirmation code expiry'),
+        ),
+        migrations.RunPython(set_expiry, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from reviews.search import create_search_index, drop_search_index
+
+TABLE = 'reviews_title'
+COLUMNS = ('name', 'description')
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor, TABLE, COLUMNS)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor, TABLE, COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_confirmation_code_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
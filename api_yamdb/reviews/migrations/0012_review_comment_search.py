@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from reviews.search import create_search_index, drop_search_index
+
+TABLES = ('reviews_review', 'reviews_comment')
+COLUMNS = ('text',)
+
+
+def create_indexes(apps, schema_editor):
+    for table in TABLES:
+        create_search_index(schema_editor, table, COLUMNS)
+
+
+def drop_indexes(apps, schema_editor):
+    for table in TABLES:
+        drop_search_index(schema_editor, table, COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 18:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import NullIf
+
+from reviews.search import restore_search_triggers
+
+
+def restore_triggers(apps, schema_editor):
+    """SQLite выполняет AddField пересозданием таблицы без триггеров."""
+    restore_search_triggers(
+        schema_editor, 'reviews_title', ('name', 'description')
+    )
+
+
+def set_weighted_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    prior_count = settings.RATING_PRIOR_COUNT
+    Title.objects.update(weighted_rating=ExpressionWrapper(
+        (F('rating_sum') + prior_count * float(settings.RATING_PRIOR_MEAN))
+        / (NullIf(F('rating_count'), 0) + prior_count),
+        output_field=FloatField()
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_review_comment_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+        migrations.RunPython(set_weighted_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating'], name='title_weighted_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating'], name='title_category_rating_idx'),
+        ),
+    ]
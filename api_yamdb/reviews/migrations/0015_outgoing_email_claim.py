@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Время резервирования'),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_by',
+            field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Зарезервировано воркером'),
+        ),
+    ]
@@ -4,8 +4,15 @@ import string
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-
+from django.core.mail import EmailMessage
+from django.db import models, transaction
+from django.db.models import (
+    Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum
+)
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from reviews.search import search
 from reviews.validators import validate_username, validate_year
 
 
@@ -43,6 +50,12 @@ class User(AbstractUser):
         blank=True,
         verbose_name='Confirmation code'
     )
+    confirmation_code_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Confirmation code expiry'
+    )
 
     class Meta:
         ordering = ['username']
@@ -63,10 +76,42 @@ class User(AbstractUser):
         validate_username(self.username)
 
     def set_confirmation_code(self, length=6):
+        """
+        Выдаёт новый код со сроком действия. Обновляются только колонки
+        кода, без сохранения всей строки и сигналов.
+        """
         self.confirmation_code = ''.join(
             secrets.choice(string.digits) for _ in range(length)
         )
-        self.save()
+        self.confirmation_code_expires_at = (
+            timezone.now() + settings.CONFIRMATION_CODE_LIFETIME
+        )
+        User.objects.filter(pk=self.pk).update(
+            confirmation_code=self.confirmation_code,
+            confirmation_code_expires_at=self.confirmation_code_expires_at,
+        )
+
+    def check_confirmation_code(self, code):
+        """Сравнивает код за постоянное время и проверяет срок действия."""
+        return bool(
+            self.confirmation_code
+            and self.confirmation_code_expires_at
+            and self.confirmation_code_expires_at > timezone.now()
+            and secrets.compare_digest(
+                self.confirmation_code.encode(), code.encode()
+            )
+        )
+
+    def consume_confirmation_code(self):
+        """
+        Гасит код условным обновлением: из параллельных запросов с одним
+        кодом успех получит только один.
+        """
+        return bool(User.objects.filter(
+            pk=self.pk,
+            confirmation_code=self.confirmation_code,
+            confirmation_code_expires_at__gt=timezone.now(),
+        ).update(confirmation_code='', confirmation_code_expires_at=None))
 
 
 class Genre(models.Model):
@@ -97,6 +142,85 @@ class Category(models.Model):
         return self.name
 
 
+class SearchQuerySet(models.QuerySet):
+    """Полнотекстовый поиск по полям search_columns."""
+    search_columns = ()
+    search_weights = ()
+
+    def search(self, text, prefix=False):
+        """Объекты, содержащие все слова text, с рангом search_rank."""
+        return search(
+            self, text, self.search_columns, self.search_weights, prefix
+        )
+
+
+def weighted_rating(total, count):
+    """
+    Байесовская оценка: средняя оценка, сглаженная RATING_PRIOR_COUNT
+    воображаемыми оценками RATING_PRIOR_MEAN, чтобы пара высоких оценок
+    не поднимала произведение выше сотни хороших. None без оценок.
+    """
+    prior_count = settings.RATING_PRIOR_COUNT
+    return ExpressionWrapper(
+        (total + prior_count * float(settings.RATING_PRIOR_MEAN))
+        / (NullIf(count, 0) + prior_count),
+        output_field=FloatField()
+    )
+
+
+class TitleQuerySet(SearchQuerySet):
+    """Операции над хранимым рейтингом и поиск произведений."""
+    search_columns = ('name', 'description')
+    # Совпадение в названии весит больше совпадения в описании.
+    search_weights = (10, 1)
+
+    def update_rating(self, score_delta, count_delta=0):
+        """
+        Атомарно изменяет сумму и количество оценок одним UPDATE и
+        пересчитывает рейтинги из новых значений.
+        """
+        total = F('rating_sum') + score_delta
+        count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=total,
+            rating_count=count,
+            rating=total / NullIf(count, 0),
+            weighted_rating=weighted_rating(total, count),
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает рейтинги заново по всем отзывам произведений."""
+        reviews = (
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by().values('title')
+        )
+        total = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        )
+        count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0
+        )
+        return self.update(
+            rating_sum=total,
+            rating_count=count,
+            rating=Subquery(reviews.annotate(average=ExpressionWrapper(
+                Sum('score') / Count('pk'),
+                output_field=models.IntegerField()
+            )).values('average')),
+            weighted_rating=weighted_rating(total, count),
+        )
+
+    def leaderboard(self, min_reviews=None):
+        """Произведения с достаточным числом оценок, лучшие первыми."""
+        if min_reviews is None:
+            min_reviews = settings.LEADERBOARD_MIN_REVIEWS
+        return self.filter(
+            rating_count__gte=max(min_reviews, 1)
+        ).order_by('-weighted_rating', '-rating_count', 'id')
+
+
 class Title(models.Model):
     """Модель Произведений."""
     name = models.CharField('Название произведения',
@@ -117,9 +241,44 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категории',
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг', null=True, blank=True, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(
+                fields=('category', 'name'), name='title_category_name_idx'
+            ),
+            models.Index(fields=('year', 'name'), name='title_year_name_idx'),
+            models.Index(
+                fields=('rating', 'name'), name='title_rating_name_idx'
+            ),
+            models.Index(
+                fields=('rating_count', 'name'),
+                name='title_rating_count_name_idx'
+            ),
+            models.Index(
+                fields=('-weighted_rating',), name='title_weighted_rating_idx'
+            ),
+            models.Index(
+                fields=('category', '-weighted_rating'),
+                name='title_category_rating_idx'
+            ),
+        )
 
     def clean(self):
         super().clean()
@@ -129,11 +288,16 @@ class Title(models.Model):
         return self.name
 
 
+class ReviewQuerySet(SearchQuerySet):
+    search_columns = ('text',)
+
+
 class Review(models.Model):
     """Модель отзывов."""
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='reviews',
         verbose_name='Произведение'
     )
@@ -149,21 +313,48 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         unique_together = ('author', 'title')
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:settings.MAX_LENGTH_BEGINNING_TEXT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные произведение и оценку для сигналов."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = (
+            instance.__dict__.get('title_id'), instance.__dict__.get('score')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв в одной транзакции с пересчётом рейтинга."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class CommentQuerySet(SearchQuerySet):
+    search_columns = ('text',)
+
 
 class Comment(models.Model):
     """Модель комментариев."""
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='comments',
         verbose_name='Отзыв'
     )
@@ -176,10 +367,83 @@ class Comment(models.Model):
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:settings.MAX_LENGTH_BEGINNING_TEXT]
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+
+    def due(self):
+        """Письма, ожидающие отправки, время попытки которых наступило."""
+        return self.filter(
+            status=OutgoingEmail.PENDING, next_attempt_at__lte=timezone.now()
+        )
+
+
+class OutgoingEmail(models.Model):
+    """Исходящее письмо в очереди на отправку."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    ]
+
+    recipient = models.EmailField('Получатель', max_length=settings.MAX_LENGTH)
+    subject = models.CharField('Тема', max_length=settings.MAX_LENGTH_NAME)
+    body = models.TextField('Текст письма')
+    status = models.CharField(
+        'Статус', max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Время следующей попытки', default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    claimed_by = models.UUIDField(
+        'Зарезервировано воркером', null=True, blank=True, editable=False
+    )
+    claimed_at = models.DateTimeField(
+        'Время резервирования', null=True, blank=True, editable=False
+    )
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='email_status_next_attempt_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+    def to_message(self):
+        return EmailMessage(
+            self.subject, self.body, settings.DEFAULT_FROM_EMAIL,
+            [self.recipient]
+        )
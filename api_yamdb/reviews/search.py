@@ -0,0 +1,191 @@
+"""
+Полнотекстовый поиск: SQLite FTS5, PostgreSQL tsvector, иначе LIKE.
+
+Индексы создаются миграциями и поддерживаются триггерами БД (в
+PostgreSQL - индексом по выражению), поэтому остаются актуальными и при
+bulk_create и queryset.update(). SQLite удаляет триггеры вместе с
+таблицей, а AddField и AlterField выполняются в нём пересозданием
+таблицы, поэтому после каждого migrate ensure_sqlite_triggers
+восстанавливает пропавшие триггеры (см. reviews/signals.py).
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+WORD = re.compile(r'\w+')
+NO_RANK = Value(0.0, output_field=FloatField())
+TRIGGERS = ('insert', 'delete', 'update')
+# Индексируемые таблицы и их столбцы, как в миграциях 0011 и 0012.
+SEARCH_INDEXES = {
+    'reviews_title': ('name', 'description'),
+    'reviews_review': ('text',),
+    'reviews_comment': ('text',),
+}
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def sqlite_triggers(table, columns):
+    """SQL триггеров, синхронизирующих таблицу FTS5 с table."""
+    fts = fts_table(table)
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});'
+    return [
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    ]
+
+
+def sqlite_rebuild(table):
+    fts = fts_table(table)
+    return f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+
+def sqlite_schema(table, columns):
+    """SQL виртуальной таблицы FTS5 над table и триггеров синхронизации."""
+    return [
+        f"CREATE VIRTUAL TABLE {fts_table(table)} USING fts5("
+        f"{', '.join(columns)}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        *sqlite_triggers(table, columns),
+        sqlite_rebuild(table),
+    ]
+
+
+def postgresql_vector(columns):
+    """Выражение индекса; должно совпадать с SQL SearchVector в search()."""
+    concatenated = " || ' ' || ".join(
+        f"COALESCE({column}, '')" for column in columns
+    )
+    return f"to_tsvector('{SEARCH_CONFIG}'::regconfig, {concatenated})"
+
+
+def create_search_index(schema_editor, table, columns):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in sqlite_schema(table, columns):
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {fts_table(table)} ON {table} '
+            f'USING GIN ({postgresql_vector(columns)})'
+        )
+
+
+def drop_sqlite_triggers(schema_editor, table):
+    fts = fts_table(table)
+    for suffix in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+
+
+def drop_search_index(schema_editor, table, columns):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        drop_sqlite_triggers(schema_editor, table)
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts_table(table)}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {fts_table(table)}')
+
+
+def restore_search_triggers(schema_editor, table, columns):
+    """
+    Заново создаёт триггеры SQLite после пересоздания таблицы и
+    перестраивает индекс. В PostgreSQL индекс переживает ALTER TABLE.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    drop_sqlite_triggers(schema_editor, table)
+    for sql in sqlite_triggers(table, columns):
+        schema_editor.execute(sql)
+    schema_editor.execute(sqlite_rebuild(table))
+
+
+def ensure_sqlite_triggers(connection):
+    """
+    Восстанавливает триггеры таблиц из SEARCH_INDEXES, у которых есть
+    таблица FTS5, но не хватает триггеров, и перестраивает их индекс.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master")
+        existing = set(cursor.fetchall())
+    with connection.schema_editor() as schema_editor:
+        for table, columns in SEARCH_INDEXES.items():
+            fts = fts_table(table)
+            if ('table', fts) not in existing or all(
+                ('trigger', f'{fts}_{suffix}') in existing
+                for suffix in TRIGGERS
+            ):
+                continue
+            restore_search_triggers(schema_editor, table, columns)
+
+
+def get_terms(text):
+    return WORD.findall(str(text).lower())
+
+
+def search(queryset, text, columns, weights=(), prefix=False):
+    """
+    Оставляет объекты, в полях columns которых есть все слова text
+    (последнее - как префикс, если prefix), и добавляет аннотацию
+    search_rank: чем она больше, тем объект релевантнее.
+    """
+    terms = get_terms(text)
+    if not terms:
+        return queryset.none().annotate(search_rank=NO_RANK)
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        return search_sqlite(queryset, terms, columns, weights, prefix)
+    if vendor == 'postgresql':
+        return search_postgresql(queryset, terms, columns, prefix)
+    condition = Q()
+    for term in terms:
+        condition &= Q(*(
+            (f'{column}__icontains', term) for column in columns
+        ), _connector=Q.OR)
+    return queryset.filter(condition).annotate(search_rank=NO_RANK)
+
+
+def search_sqlite(queryset, terms, columns, weights, prefix):
+    table = queryset.model._meta.db_table
+    fts = fts_table(table)
+    match = ' '.join(f'"{term}"' for term in terms) + ('*' if prefix else '')
+    bm25 = ', '.join([fts, *map(str, weights)])
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', (match,)
+    )).annotate(search_rank=RawSQL(
+        f'SELECT -bm25({bm25}) FROM {fts} '
+        f'WHERE {fts} MATCH %s AND rowid = "{table}"."id"',
+        (match,), output_field=FloatField()
+    ))
+
+
+def search_postgresql(queryset, terms, columns, prefix):
+    from django.contrib.postgres.search import (
+        SearchQuery, SearchRank, SearchVector
+    )
+
+    vector = SearchVector(*columns, config=SEARCH_CONFIG)
+    query = SearchQuery(
+        ' & '.join(terms) + (':*' if prefix else ''),
+        config=SEARCH_CONFIG, search_type='raw'
+    )
+    return queryset.annotate(search_vector=vector).filter(
+        search_vector=query
+    ).annotate(search_rank=SearchRank(vector, query))
@@ -0,0 +1,51 @@
+"""Сигналы поддержки хранимого рейтинга и поискового индекса."""
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import Signal, receiver
+
+from reviews.models import Review, Title
+from reviews.search import ensure_sqlite_triggers
+
+# Отправляется после массовых изменений в обход сигналов моделей,
+# аргумент models - список изменённых моделей.
+bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    titles = Title.objects
+    if created:
+        titles.filter(pk=instance.title_id).update_rating(instance.score, 1)
+    else:
+        loaded = getattr(instance, '_loaded_rating', None)
+        if loaded is None or None in loaded:
+            titles.filter(pk=instance.title_id).recalculate_rating()
+        elif loaded[0] != instance.title_id:
+            titles.filter(pk=loaded[0]).update_rating(-loaded[1], -1)
+            titles.filter(pk=instance.title_id).update_rating(
+                instance.score, 1
+            )
+        elif loaded[1] != instance.score:
+            titles.filter(pk=instance.title_id).update_rating(
+                instance.score - loaded[1]
+            )
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удалённого отзыва из рейтинга произведения."""
+    Title.objects.filter(pk=instance.title_id).update_rating(
+        -instance.score, -1
+    )
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """
+    Возвращает триггеры поиска, удалённые пересозданием таблицы в
+    миграции SQLite.
+    """
+    if sender.label == 'reviews':
+        ensure_sqlite_triggers(connections[using])
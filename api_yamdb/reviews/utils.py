@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def keep_dates(model):
+    """Отключает auto_now_add, чтобы массовая вставка сохранила даты."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
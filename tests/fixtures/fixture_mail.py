@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def send_email_immediately(settings):
+    """Отправка писем при запросе, без очереди EMAIL_OUTBOX."""
+    settings.EMAIL_OUTBOX = False
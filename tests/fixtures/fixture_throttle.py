@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_throttling():
+    from api.throttling import local_store
+
+    local_store.clear()
+    yield
+    local_store.clear()
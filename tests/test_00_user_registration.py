@@ -104,6 +104,7 @@ class Test00UserRegistration:
             'содержанию - новый пользователь не должен быть создан.'
         )
 
+    @pytest.mark.usefixtures('send_email_immediately')
     def test_00_valid_data_user_signup(self, client, django_user_model):
         outbox_before_count = len(mail.outbox)
         valid_data = {
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_reviews(self, django_user_model, title_id, count):
+        from reviews.models import Review
+
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title_id=title_id, author=author, text=f'review {idx}',
+                score=idx % 10 + 1
+            )
+        return list(
+            Review.objects.filter(title_id=title_id)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+
+    def test_01_cursor_pages(self, client, admin_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        expected = self.create_reviews(django_user_model, title_id, 23)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data and not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что пагинация по курсору не выполняет подсчёт '
+            'количества объектов.'
+        )
+        assert data['previous'] is None
+
+        received, pages = [], []
+        while True:
+            received.extend(item['id'] for item in data['results'])
+            pages.append(data)
+            if not data['next']:
+                break
+            response = client.get(data['next'])
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+        assert received == expected, (
+            'Проверьте, что пагинация по курсору возвращает все отзывы без '
+            'пропусков и повторов в порядке от новых к старым.'
+        )
+        assert len(pages) == 3
+
+        response = client.get(pages[-1]['previous'])
+        assert [item['id'] for item in response.json()['results']] == (
+            [item['id'] for item in pages[1]['results']]
+        ), 'Проверьте, что ссылка `previous` ведёт на предыдущую страницу.'
+
+    def test_02_invalid_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url, {'cursor': 'not-a-cursor'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `pagination=cursor` сохраняется '
+            'постраничная пагинация.'
+        )
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_many_titles(self, admin_client, count):
+        from reviews.models import Category, Genre, Title
+
+        create_titles(admin_client)
+        genres = list(Genre.objects.all())
+        category = Category.objects.first()
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres[:idx % len(genres) + 1])
+
+    def create_review_with_comments(self, admin_client, django_user_model,
+                                    count):
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(count)
+        ]
+        reviews = [
+            Review.objects.create(
+                title_id=titles[0]['id'], author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+        return titles[0]['id'], reviews[0].id
+
+    @pytest.mark.parametrize('titles_count', (3, 25))
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries, titles_count):
+        self.create_many_titles(admin_client, titles_count)
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            title['genre'] and title['category']
+            for title in response.json()['results']
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            )
+        assert response.status_code == HTTPStatus.OK
+
+    @pytest.mark.parametrize('authors_count', (2, 12))
+    def test_03_reviews_list_queries(self, client, admin_client,
+                                     django_user_model,
+                                     django_assert_num_queries,
+                                     authors_count):
+        title_id, _ = self.create_review_with_comments(
+            admin_client, django_user_model, authors_count
+        )
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert all(review['author'] for review in response.json()['results'])
+
+    @pytest.mark.parametrize('authors_count', (2, 12))
+    def test_04_comments_list_queries(self, client, admin_client,
+                                      django_user_model,
+                                      django_assert_num_queries,
+                                      authors_count):
+        title_id, review_id = self.create_review_with_comments(
+            admin_client, django_user_model, authors_count
+        )
+        with django_assert_num_queries(3):
+            response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ))
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            comment['author'] for comment in response.json()['results']
+        )
+
+    def test_05_comments_of_other_title(self, client, admin_client,
+                                        django_user_model):
+        title_id, review_id = self.create_review_with_comments(
+            admin_client, django_user_model, 1
+        )
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id + 1, review_id=review_id
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии доступны только по адресу '
+            'произведения, к которому относится отзыв.'
+        )
+
+    def test_06_explain_queries_patterns(self, admin_client,
+                                         django_user_model,
+                                         django_assert_num_queries):
+        from reviews.management.commands.explain_queries import Command
+
+        self.create_review_with_comments(admin_client, django_user_model, 2)
+        # Отзыв, произведение, категория и жанр; без догрузки полей.
+        with django_assert_num_queries(4):
+            Command().get_patterns(10)
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def get_stats(self):
+        from api.cache import get_stats
+
+        return get_stats()
+
+    def test_01_repeated_list_is_cached(self, client, admin_client,
+                                        django_assert_num_queries):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL, {'year': 1984, 'genre': 'horror'})
+        with django_assert_num_queries(0):
+            response = client.get(
+                self.TITLES_URL, {'genre': 'horror', 'year': 1984}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+        assert self.get_stats() == {'hits': 1, 'misses': 1}, (
+            'Проверьте, что повторный запрос с теми же параметрами в другом '
+            'порядке обслуживается из кэша.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        assert len(client.get(self.GENRES_URL).json()['results']) == 3
+
+        admin_client.post(self.GENRES_URL, data={'name': 'Мюзикл',
+                                                 'slug': 'musical'})
+        assert len(client.get(self.GENRES_URL).json()['results']) == 4, (
+            'Проверьте, что создание жанра сбрасывает кэш списка жанров.'
+        )
+
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        client.get(self.TITLES_URL)
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        results = client.get(self.TITLES_URL).json()['results']
+        rating = {title['id']: title['rating'] for title in results}
+        assert rating[titles[0]['id']] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений.'
+        )
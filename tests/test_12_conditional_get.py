@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_etag_not_modified(self, client, admin_client, user_client,
+                                  django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            'Проверьте, что ответ на GET-запрос содержит заголовки `ETag` и '
+            '`Last-Modified`.'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.get('ETag') == etag
+        assert not response.content
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response.get('ETag') != etag
+
+    def test_02_last_modified_and_detail(self, client, admin_client,
+                                         monkeypatch):
+        import time
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 2)
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(
+            url, HTTP_IF_NONE_MATCH='"stale"',
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что при наличии If-None-Match заголовок '
+            'If-Modified-Since не учитывается.'
+        )
+
+    def test_03_etag_depends_on_user(self, client, user_client):
+        url = '/api/v1/users/me/'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'ETag' not in response, (
+            'Проверьте, что ETag не выставляется для действий, кроме '
+            'получения списка и объекта.'
+        )
+        etag = user_client.get('/api/v1/titles/')['ETag']
+        assert client.get('/api/v1/titles/')['ETag'] != etag
+
+    def test_04_same_second_write(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        last_modified = client.get(url)['Last-Modified']
+        response = admin_client.patch(url, data={'name': 'Новое название'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду не даёт устаревший '
+            'ответ 304 по If-Modified-Since.'
+        )
+
+    def test_05_reviews_etag_per_title(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        etag = client.get(url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к одному произведению не меняет ETag '
+            'списка отзывов к другому.'
+        )
+
+    def test_06_any_etag_requires_resource(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for url, status in (
+            (self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+             HTTPStatus.NOT_MODIFIED),
+            (self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=9999),
+             HTTPStatus.NOT_FOUND),
+            (self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+             HTTPStatus.NOT_MODIFIED),
+            (self.REVIEWS_URL_TEMPLATE.format(title_id=9999),
+             HTTPStatus.NOT_FOUND),
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == status, (
+                f'Проверьте, что GET-запрос к `{url}` с If-None-Match: * '
+                'возвращает 304 только для существующего ресурса.'
+            )
@@ -0,0 +1,49 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_static_data(self, client):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('import_csv', batch_size=10)
+        counts = (
+            User.objects.count(), Title.objects.count(),
+            Title.genre.through.objects.count(), Review.objects.count(),
+            Comment.objects.count(),
+        )
+        assert counts == (5, 32, 42, 72, 3), (
+            'Проверьте, что команда `import_csv` загружает все файлы '
+            'из static/data.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки рейтинг произведений пересчитан.'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что при загрузке сохраняются даты публикации.'
+        )
+
+        Title.objects.filter(pk=1).update(name='Изменено')
+        call_command('import_csv', update=True)
+        assert Title.objects.count() == 32
+        assert Title.objects.get(pk=1).name == 'Побег из Шоушенка', (
+            'Проверьте, что режим `--update` обновляет существующие записи.'
+        )
+        response = client.get('/api/v1/titles/1/')
+        assert response.json()['name'] == 'Побег из Шоушенка'
+
+    def test_02_report_skipped_rows(self):
+        call_command('import_csv', stdout=StringIO())
+        stdout = StringIO()
+        call_command('import_csv', stdout=stdout)
+        assert 'titles.csv: 32 строк, создано 0, пропущено 32' in (
+            stdout.getvalue()
+        ), (
+            'Проверьте, что повторная загрузка не сообщает о созданных '
+            'записях, пропущенных из-за конфликтов.'
+        )
@@ -0,0 +1,67 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{name}/'
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        url = self.EXPORT_URL_TEMPLATE.format(name='reviews')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(name='unknown')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_export_formats(self, admin_client, admin, user_client, user,
+                               moderator_client, moderator):
+        reviews, _ = create_reviews(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client
+        })
+        url = self.EXPORT_URL_TEMPLATE.format(name='reviews')
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [row['id'] for row in rows] == sorted(
+            review['id'] for review in reviews
+        )
+        assert rows[0]['text'] == reviews[0]['text']
+
+        response = admin_client.get(url, {'output': 'csv'})
+        assert response['Content-Type'].startswith('text/csv')
+        content = b''.join(response.streaming_content).decode()
+        assert len(list(csv.DictReader(StringIO(content)))) == len(reviews)
+
+        response = admin_client.get(url, {'output': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_export_command(self, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        output, errors = StringIO(), StringIO()
+        call_command(
+            'export_data', 'titles', output_format='csv', stdout=output,
+            stderr=errors
+        )
+        rows = list(csv.DictReader(StringIO(output.getvalue())))
+        assert [row['name'] for row in rows] == ['Терминатор',
+                                                 'Крепкий орешек']
+        assert 'Выгружено строк: 2 ' in errors.getvalue(), (
+            'Проверьте, что число выгруженных строк не включает заголовок '
+            'CSV.'
+        )
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15GenerateData:
+
+    OPTIONS = {
+        'users': 5, 'categories': 2, 'genres': 3, 'titles': 10,
+        'reviews': 40, 'comments': 30, 'seed': 7, 'stdout': StringIO(),
+    }
+
+    def test_01_generate_data(self):
+        from reviews.models import Comment, Review, Title
+
+        call_command('generate_data', **self.OPTIONS)
+        assert Review.objects.count() == 40, (
+            'Проверьте, что команда `generate_data` создаёт заданное '
+            'количество отзывов.'
+        )
+        assert Comment.objects.count() == 30
+        assert Title.objects.filter(rating_count__gt=0).exists(), (
+            'Проверьте, что после генерации рейтинг произведений пересчитан.'
+        )
+        scores = list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score'
+        ))
+
+        with pytest.raises(CommandError):
+            call_command('generate_data', **self.OPTIONS)
+
+        Title.objects.all().delete()
+        call_command('generate_data', prefix='again', **self.OPTIONS)
+        user_shift = 5
+        title_shift = 10
+        regenerated = [
+            (title_id - title_shift, author_id - user_shift, score)
+            for title_id, author_id, score in Review.objects.order_by(
+                'pk'
+            ).values_list('title_id', 'author_id', 'score')
+        ]
+        assert regenerated == scores, (
+            'Проверьте, что при одинаковом `--seed` генерируются одинаковые '
+            'данные.'
+        )
+
+    def test_02_rating_query_size(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('generate_data', **self.OPTIONS)
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert updates and all(' IN (' not in sql for sql in updates), (
+            'Проверьте, что пересчёт рейтинга не передаёт в запрос id всех '
+            'созданных произведений: их число ограничено в СУБД.'
+        )
+        assert Title.objects.filter(rating_count__gt=0).exists()
@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def test_01_benchmark_report(self, tmp_path):
+        output = tmp_path / 'report.json'
+        call_command('generate_data', users=5, categories=2, genres=3,
+                     titles=5, reviews=20, comments=20, stdout=StringIO())
+        # Пишущий сценарий - в один поток: in-memory SQLite тестов
+        # блокирует таблицы целиком и не ждёт освобождения блокировки.
+        call_command(
+            'benchmark_api', requests=3, warmup=1,
+            only=['token_obtain'], output=str(output), stdout=StringIO()
+        )
+        results = json.loads(output.read_text(encoding='utf-8'))['results']
+        call_command(
+            'benchmark_api', requests=3, warmup=1, concurrency=2,
+            only=['titles_list', 'reviews_list'],
+            output=str(output),
+            stdout=StringIO()
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['results'] and all(
+            name.startswith(('titles_list', 'reviews_list'))
+            for name in report['results']
+        ), (
+            'Проверьте, что `--only` ограничивает набор сценариев.'
+        )
+        assert results
+        results.update(report['results'])
+        for result in results.values():
+            assert result['errors'] == 0
+            assert {'p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries'} <= set(
+                result
+            ), 'Проверьте, что отчёт содержит перцентили, rps и число запросов.'
+
+        stdout = StringIO()
+        call_command(
+            'benchmark_api', requests=2, warmup=0, only=['titles_list'],
+            compare=str(output), stdout=stdout
+        )
+        assert 'titles_list' in stdout.getvalue()
+
+    def test_02_benchmark_requires_data(self):
+        with pytest.raises(CommandError):
+            call_command('benchmark_api', requests=1, stdout=StringIO())
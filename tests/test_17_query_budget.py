@@ -0,0 +1,62 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_debug_headers(self, client, admin_client, settings):
+        from api.middleware import QUERY_COUNT_HEADER, QUERY_TIME_HEADER
+
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        assert QUERY_COUNT_HEADER not in response, (
+            'Проверьте, что число запросов к БД не раскрывается без DEBUG.'
+        )
+
+        settings.DEBUG = True
+        response = client.get(self.GENRES_URL, {'search': 'horror'})
+        assert response.status_code == HTTPStatus.OK
+        assert int(response[QUERY_COUNT_HEADER]) == 2, (
+            'Проверьте, что в режиме DEBUG ответ содержит число SQL-запросов.'
+        )
+        assert float(response[QUERY_TIME_HEADER]) >= 0
+
+    def test_02_budget_exceeded(self, client, admin_client, monkeypatch,
+                                settings, caplog):
+        from api.middleware import QueryBudgetExceeded
+        from api.views import GenreViewSet
+
+        create_titles(admin_client)
+        monkeypatch.setattr(GenreViewSet, 'query_budget', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded):
+            client.get(self.GENRES_URL)
+
+        settings.QUERY_BUDGET_RAISE = False
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            response = client.get(self.GENRES_URL, {'search': 'horror'})
+        assert response.status_code == HTTPStatus.OK
+        assert 'бюджете 1' in caplog.text, (
+            'Проверьте, что превышение бюджета без QUERY_BUDGET_RAISE '
+            'записывается в лог.'
+        )
+
+    def test_03_viewsets_declare_budgets(self):
+        from api import views
+
+        viewsets = (
+            views.UserViewSet, views.GenreViewSet, views.CategoryViewSet,
+            views.TitleViewSet, views.ReviewViewSet, views.CommentViewSet,
+        )
+        for viewset in viewsets:
+            assert 'list' in getattr(viewset, 'query_budget', {}), (
+                f'Проверьте, что для `{viewset.__name__}` задан бюджет '
+                'запросов списка.'
+            )
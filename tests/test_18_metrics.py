@@ -0,0 +1,150 @@
+import json
+import re
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+def metric_value(text, name, **labels):
+    """Значение метрики с заданными метками из текста /metrics."""
+    for line in text.splitlines():
+        match = re.fullmatch(r'(\w+)(?:\{(.*)\})? (\S+)', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+        if all(found.get(key) == str(value) for key, value in labels.items()):
+            return float(match.group(3))
+    return 0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Metrics:
+
+    METRICS_URL = '/metrics'
+    TITLES_URL = '/api/v1/titles/'
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def get_metrics(self, client):
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.METRICS_URL}` доступен.'
+        )
+        assert response['Content-Type'].startswith('text/plain')
+        return response.content.decode()
+
+    def test_01_request_metrics(self, client, admin_client):
+        create_titles(admin_client)
+        before = self.get_metrics(client)
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        client.post(self.SIGNUP_URL, data={
+            'username': 'metrics_user', 'email': 'metrics@yamdb.fake'
+        })
+        call_command('run_mail_worker', once=True, stdout=StringIO())
+        text = self.get_metrics(client)
+
+        labels = {'view': 'TitleViewSet', 'action': 'list'}
+        requests = 'yamdb_http_requests_total'
+        assert metric_value(
+            text, requests, method='GET', status=200, **labels
+        ) - metric_value(
+            before, requests, method='GET', status=200, **labels
+        ) == 2, (
+            'Проверьте, что /metrics считает запросы по вьюсетам и действиям.'
+        )
+        assert metric_value(
+            text, 'yamdb_http_request_duration_seconds_bucket',
+            le='+Inf', **labels
+        ) >= 2
+        assert metric_value(text, 'yamdb_db_queries_total', **labels) > 0, (
+            'Проверьте, что /metrics считает SQL-запросы.'
+        )
+        assert metric_value(
+            text, 'yamdb_cache_requests_total', result='hits'
+        ) >= 1
+        assert 0 < metric_value(text, 'yamdb_cache_hit_ratio') <= 1
+        assert metric_value(
+            text, 'yamdb_email_send_duration_seconds_count'
+        ) > metric_value(before, 'yamdb_email_send_duration_seconds_count'), (
+            'Проверьте, что /metrics измеряет время отправки писем.'
+        )
+
+    def test_02_multiprocess_aggregation(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        labels = [['view', 'TitleViewSet'], ['action', 'list'],
+                  ['method', 'GET'], ['status', 200]]
+        (tmp_path / 'metrics-1.json').write_text(json.dumps({
+            'counters': [['yamdb_http_requests_total', labels, 5]],
+            'histograms': [],
+        }))
+        own = metric_value(
+            self.get_metrics(client), 'yamdb_http_requests_total',
+            view='TitleViewSet', action='list'
+        )
+        settings.METRICS_DIR = None
+        single = metric_value(
+            self.get_metrics(client), 'yamdb_http_requests_total',
+            view='TitleViewSet', action='list'
+        )
+        assert own == single + 5, (
+            'Проверьте, что в многопроцессном режиме /metrics суммирует '
+            'снимки всех воркеров.'
+        )
+        assert list(tmp_path.glob('metrics-*.json')) != []
+
+    def test_03_dead_snapshots_archived(self, client, settings, tmp_path):
+        import subprocess
+        import sys
+
+        settings.METRICS_DIR = str(tmp_path)
+        labels = [['view', 'GhostView'], ['action', 'list'],
+                  ['method', 'GET'], ['status', 200]]
+
+        def write_dead_snapshot(value):
+            finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+            finished.wait()
+            path = tmp_path / f'metrics-{finished.pid}.json'
+            path.write_text(json.dumps({
+                'counters': [['yamdb_http_requests_total', labels, value]],
+                'histograms': [['yamdb_email_send_duration_seconds', [],
+                                [1] + [0] * 11 + [0.5]]],
+            }))
+            return path
+
+        def get_ghost_values():
+            text = self.get_metrics(client)
+            return (
+                metric_value(text, 'yamdb_http_requests_total',
+                             view='GhostView'),
+                metric_value(text, 'yamdb_email_send_duration_seconds_sum')
+            )
+
+        dead = write_dead_snapshot(5)
+        before = get_ghost_values()
+        assert before[0] == 5
+        assert not dead.exists(), (
+            'Проверьте, что снимок завершившегося воркера удаляется.'
+        )
+        assert get_ghost_values() == before, (
+            'Проверьте, что счётчики завершившегося воркера сохраняются в '
+            'архиве и не уменьшаются.'
+        )
+        write_dead_snapshot(3)
+        after = get_ghost_values()
+        settings.METRICS_DIR = None
+        assert after[0] == 8
+        assert after[1] == pytest.approx(before[1] + 0.5)
+
+    def test_04_allowed_ips(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ['10.0.0.0/8']
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что /metrics доступен только из '
+            'METRICS_ALLOWED_IPS.'
+        )
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='10.1.2.3')
+        assert response.status_code == HTTPStatus.OK
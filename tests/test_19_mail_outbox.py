@@ -0,0 +1,142 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.utils import CountingBackend
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19MailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def use_outbox(self, settings):
+        settings.EMAIL_OUTBOX = True
+
+    def signup(self, client, count=1):
+        for idx in range(count):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': f'outbox{idx}', 'email': f'outbox{idx}@yamdb.fake'
+            })
+            assert response.status_code == 200
+
+    def run_worker(self, **options):
+        call_command('run_mail_worker', once=True, stdout=StringIO(),
+                     **options)
+
+    def test_01_signup_enqueues_email(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.utils.CountingBackend'
+        CountingBackend.opened = 0
+        self.signup(client, count=3)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно.'
+        )
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING
+        ).count() == 3, 'Проверьте, что письмо ставится в очередь.'
+
+        self.run_worker()
+        assert len(mail.outbox) == 3
+        assert mail.outbox[0].to == ['outbox0@yamdb.fake']
+        assert 'Код подтверждения' in mail.outbox[0].subject
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что воркер отправляет пакет писем через одно '
+            'соединение.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+
+        self.run_worker()
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        self.signup(client)
+        settings.EMAIL_BACKEND = 'tests.utils.FailingBackend'
+        started = timezone.now()
+        self.run_worker(backoff=60)
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at >= started + timezone.timedelta(
+            seconds=60
+        ), 'Проверьте, что повторная попытка откладывается.'
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        self.run_worker(backoff=60, max_attempts=2)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после исчерпания попыток письмо помечается '
+            'неотправленным.'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        self.run_worker()
+        assert len(mail.outbox) == 0
+
+    def test_03_claim_is_exclusive(self, client):
+        import uuid
+
+        from api.management.commands.run_mail_worker import LEASE, Command
+        from reviews.models import OutgoingEmail
+
+        self.signup(client, count=3)
+        first = Command().claim(2)
+        second = Command().claim(10)
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что воркер не резервирует письма, уже '
+            'зарезервированные другим воркером.'
+        )
+        assert not {email.pk for email in first} & {
+            email.pk for email in second
+        }
+        assert Command().claim(10) == []
+
+        OutgoingEmail.objects.filter(pk=first[0].pk).update(
+            claimed_by=uuid.uuid4(), claimed_at=timezone.now() - LEASE * 2
+        )
+        assert [email.pk for email in Command().claim(10)] == [
+            first[0].pk
+        ], (
+            'Проверьте, что письма упавшего воркера возвращаются в очередь '
+            'после истечения резерва.'
+        )
+
+    def test_04_claim_skips_emails_taken_meanwhile(self, client,
+                                                   monkeypatch):
+        import uuid
+
+        from api.management.commands.run_mail_worker import Command
+        from reviews.models import OutgoingEmail, OutgoingEmailQuerySet
+
+        self.signup(client, count=2)
+        taken, free = OutgoingEmail.objects.order_by('pk')
+        update = OutgoingEmailQuerySet.update
+
+        def update_after_other_worker(queryset, **kwargs):
+            # Другой воркер резервирует письмо между выбором id и UPDATE.
+            monkeypatch.setattr(OutgoingEmailQuerySet, 'update', update)
+            OutgoingEmail.objects.filter(pk=taken.pk).update(
+                claimed_by=uuid.uuid4(), claimed_at=timezone.now()
+            )
+            return update(queryset, **kwargs)
+
+        monkeypatch.setattr(
+            OutgoingEmailQuerySet, 'update', update_after_other_worker
+        )
+        assert [email.pk for email in Command().claim(10)] == [free.pk], (
+            'Проверьте, что письмо, зарезервированное другим воркером, '
+            'не отправляется повторно.'
+        )
@@ -0,0 +1,140 @@
+import smtplib
+import threading
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+
+from tests.utils import CountingBackend, FailingBackend
+
+
+def make_messages(*recipients):
+    return [
+        EmailMessage('Тема', 'Текст', 'yamdb@yamdb.fake', [recipient])
+        for recipient in recipients
+    ]
+
+
+class Test20Mailer:
+
+    @pytest.fixture(autouse=True)
+    def counting_backend(self, settings):
+        settings.EMAIL_BACKEND = 'tests.utils.CountingBackend'
+        CountingBackend.opened = 0
+
+    def get_mailer(self):
+        from api.mail import Mailer
+
+        return Mailer()
+
+    def test_01_connection_reused(self):
+        mailer = self.get_mailer()
+        assert mailer.send(make_messages('a@yamdb.fake', 'b@yamdb.fake')) == [
+            None, None
+        ]
+        mailer.send(make_messages('c@yamdb.fake'))
+        assert len(mail.outbox) == 3
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что письма разных пакетов отправляются через одно '
+            'соединение.'
+        )
+
+    def test_02_connection_recycled(self, settings):
+        settings.EMAIL_CONNECTION_MAX_MESSAGES = 2
+        mailer = self.get_mailer()
+        mailer.send(make_messages(*(f'{idx}@yamdb.fake' for idx in range(5))))
+        assert CountingBackend.opened == 3, (
+            'Проверьте, что соединение переоткрывается после '
+            'EMAIL_CONNECTION_MAX_MESSAGES писем.'
+        )
+
+        settings.EMAIL_CONNECTION_MAX_MESSAGES = 100
+        settings.EMAIL_CONNECTION_IDLE_TIMEOUT = 0
+        CountingBackend.opened = 0
+        mailer.send(make_messages('a@yamdb.fake'))
+        mailer.send(make_messages('b@yamdb.fake'))
+        assert CountingBackend.opened == 2, (
+            'Проверьте, что простаивающее соединение переоткрывается.'
+        )
+
+    def test_03_failures_are_isolated(self, settings, monkeypatch):
+        from api import metrics
+
+        settings.EMAIL_BACKEND = 'tests.utils.FailingBackend'
+        monkeypatch.setattr(FailingBackend, 'failing', ('bad@yamdb.fake',))
+        failed = metrics.REGISTRY.counters.get(
+            (metrics.EMAILS_SENT, (('result', 'failed'),)), 0
+        )
+        errors = self.get_mailer().send(
+            make_messages('a@yamdb.fake', 'bad@yamdb.fake', 'b@yamdb.fake')
+        )
+        assert errors[0] is None and errors[2] is None
+        assert isinstance(errors[1], ConnectionError), (
+            'Проверьте, что ошибка отправки одного письма не мешает '
+            'отправке остальных.'
+        )
+        assert [message.to for message in mail.outbox] == [
+            ['a@yamdb.fake'], ['b@yamdb.fake']
+        ]
+        assert metrics.REGISTRY.counters[
+            (metrics.EMAILS_SENT, (('result', 'failed'),))
+        ] == failed + 1
+
+    def test_04_file_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        self.get_mailer().send(make_messages('a@yamdb.fake', 'b@yamdb.fake'))
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, (
+            'Проверьте, что пакет писем записывается через одно соединение.'
+        )
+        assert files[0].read_text().count('Subject: ') == 2
+
+    def test_05_rejected_message_not_resent(self, settings, monkeypatch):
+        settings.EMAIL_BACKEND = 'tests.utils.FailingBackend'
+        monkeypatch.setattr(FailingBackend, 'failing', ('bad@yamdb.fake',))
+        monkeypatch.setattr(FailingBackend, 'attempts', 0)
+        monkeypatch.setattr(FailingBackend, 'error', staticmethod(
+            lambda message: smtplib.SMTPRecipientsRefused(
+                {message.to[0]: (550, b'No such user')}
+            )
+        ))
+        mailer = self.get_mailer()
+        errors = mailer.send(make_messages('a@yamdb.fake', 'bad@yamdb.fake'))
+        assert isinstance(errors[1], smtplib.SMTPRecipientsRefused)
+        assert FailingBackend.attempts == 1, (
+            'Проверьте, что письмо, отклонённое сервером, не отправляется '
+            'повторно: переподключение нужно только при обрыве соединения.'
+        )
+
+        monkeypatch.setattr(FailingBackend, 'error', staticmethod(
+            lambda message: smtplib.SMTPServerDisconnected('Обрыв')
+        ))
+        mailer.send(make_messages('a@yamdb.fake'))
+        errors = mailer.send(make_messages('bad@yamdb.fake'))
+        assert isinstance(errors[0], smtplib.SMTPServerDisconnected)
+        assert FailingBackend.attempts == 3, (
+            'Проверьте, что после обрыва переиспользованного соединения '
+            'письмо отправляется повторно через новое.'
+        )
+
+    def test_06_connection_per_thread(self):
+        mailer = self.get_mailer()
+        connections = []
+
+        def send():
+            mailer.send(make_messages('a@yamdb.fake'))
+            connections.append(mailer.connection)
+
+        threads = [threading.Thread(target=send) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        send()
+        assert len(mail.outbox) == 3
+        assert len({id(connection) for connection in connections}) == 3, (
+            'Проверьте, что у каждого потока своё соединение с почтовым '
+            'сервером и отправки из разных потоков не ждут друг друга.'
+        )
+        assert CountingBackend.opened == 3
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CachedAuth:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    USER_DETAIL_URL = '/api/v1/users/{username}/'
+    ME_URL = '/api/v1/users/me/'
+
+    def user_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_user' in query['sql']
+        ]
+
+    def test_01_user_is_cached(self, user_client):
+        assert len(self.user_queries(user_client, self.CATEGORIES_URL)) == 1
+        assert self.user_queries(user_client, self.CATEGORIES_URL) == [], (
+            'Проверьте, что повторная аутентификация по JWT-токену не '
+            'обращается к таблице пользователей.'
+        )
+        response = user_client.get(self.ME_URL)
+        assert response.json()['email'] == 'testuser@yamdb.fake', (
+            'Проверьте, что `/users/me/` возвращает все поля пользователя.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, user, user_client,
+                                              admin_client):
+        data = {'name': 'Фильм', 'slug': 'films'}
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        admin_client.patch(
+            self.USER_DETAIL_URL.format(username=user.username),
+            data={'role': 'admin'}
+        )
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что смена роли пользователя сбрасывает его кэш '
+            'аутентификации.'
+        )
+
+    def test_03_deleted_or_inactive_user_rejected(self, user, user_client,
+                                                  moderator, moderator_client,
+                                                  admin_client):
+        user_client.get(self.CATEGORIES_URL)
+        admin_client.delete(
+            self.USER_DETAIL_URL.format(username=user.username)
+        )
+        response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+        moderator_client.get(self.CATEGORIES_URL)
+        moderator.is_active = False
+        moderator.save()
+        response = moderator_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен неактивного пользователя не принимается.'
+        )
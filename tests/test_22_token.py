@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Token:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_ME = '/api/v1/users/me/'
+
+    def signup(self, client):
+        from reviews.models import User
+
+        client.post(self.URL_SIGNUP, data={
+            'username': 'token_user', 'email': 'token_user@yamdb.fake'
+        })
+        return User.objects.get(username='token_user').confirmation_code
+
+    def test_01_token_issued(self, client, django_assert_num_queries):
+        code = self.signup(client)
+        data = {'username': 'token_user', 'confirmation_code': code}
+        with django_assert_num_queries(2):
+            response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос с верным кодом подтверждения к '
+            f'`{self.URL_TOKEN}` возвращает ответ со статусом 200.'
+        )
+        token = response.json().get('token')
+        assert token, 'Проверьте, что в ответе передаётся поле `token`.'
+
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert api_client.get(self.URL_ME).json()['username'] == 'token_user'
+
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя использовать повторно.'
+        )
+
+    def test_02_wrong_code(self, client):
+        code = self.signup(client)
+        wrong_code = str((int(code) + 1) % 10 ** len(code)).zfill(len(code))
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'token_user', 'confirmation_code': wrong_code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'token_user', 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что неверная попытка не гасит действующий код.'
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        def set_rates(**rates):
+            settings.REST_FRAMEWORK = {
+                **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates
+            }
+        return set_rates
+
+    def signup(self, client, username):
+        return client.post(self.URL_SIGNUP, data={
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+
+    def test_01_username_limit(self, client, rates,
+                               django_assert_num_queries):
+        rates(signup_username='2/hour')
+        for _ in range(2):
+            assert self.signup(client, 'flood').status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = self.signup(client, 'flood')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что повторные регистрации одного username '
+            'ограничиваются без обращения к БД.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert self.signup(client, 'other').status_code == HTTPStatus.OK
+
+    def test_02_ip_limit(self, client, rates):
+        rates(token_ip='3/min')
+        for idx in range(3):
+            response = client.post(self.URL_TOKEN, data={
+                'username': f'user{idx}', 'confirmation_code': '1'
+            })
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'user4', 'confirmation_code': '1'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запросы токена ограничиваются по IP-адресу.'
+        )
+
+    def test_03_cache_store(self, client, rates, settings):
+        from api.throttling import local_store
+
+        settings.THROTTLE_STORE = 'cache'
+        rates(signup_email='1/hour')
+        assert self.signup(client, 'cached').status_code == HTTPStatus.OK
+        assert not local_store.buckets, (
+            'Проверьте, что при THROTTLE_STORE=cache корзины хранятся в кэше.'
+        )
+        response = self.signup(client, 'cached')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_04_bucket_refill(self):
+        from api.throttling import parse_rate, take_token
+
+        capacity, refill_rate = parse_rate('2/min')
+        assert (capacity, refill_rate) == (2, 2 / 60)
+        state, wait = take_token(None, capacity, refill_rate, now=0)
+        state, wait = take_token(state, capacity, refill_rate, now=0)
+        assert wait == 0
+        state, wait = take_token(state, capacity, refill_rate, now=1)
+        assert wait == pytest.approx(29), (
+            'Проверьте, что пустая корзина сообщает время ожидания жетона.'
+        )
+        state, wait = take_token(state, capacity, refill_rate, now=30)
+        assert wait == 0, 'Проверьте, что корзина пополняется со временем.'
+
+    @pytest.mark.parametrize('body', ('["flood"]', '"flood"', '42'))
+    def test_05_body_not_object(self, client, rates, body):
+        rates(
+            signup_username='5/hour', signup_email='5/hour',
+            token_username='5/hour'
+        )
+        for url in (self.URL_SIGNUP, self.URL_TOKEN):
+            response = client.post(
+                url, data=body, content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` с телом, которое не '
+                'является JSON-объектом, возвращает ответ со статусом 400.'
+            )
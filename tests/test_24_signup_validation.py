@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SignupValidation:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def validate(self, username, email):
+        from api.serializers import SignupSerializer
+
+        serializer = SignupSerializer(
+            data={'username': username, 'email': email}
+        )
+        with CaptureQueriesContext(connection) as context:
+            valid = serializer.is_valid()
+        return valid, context.captured_queries
+
+    def test_01_single_narrow_query(self, user):
+        cases = (
+            (user.username, user.email, True),
+            ('new_user', 'new@yamdb.fake', True),
+            ('new_user', user.email, False),
+            (user.username, 'new@yamdb.fake', False),
+        )
+        for username, email, expected in cases:
+            valid, queries = self.validate(username, email)
+            assert valid is expected
+            assert len(queries) == 1, (
+                'Проверьте, что уникальность username и email проверяется '
+                'одним запросом.'
+            )
+            assert 'password' not in queries[0]['sql'], (
+                'Проверьте, что проверка уникальности не загружает '
+                'строку пользователя целиком.'
+            )
+
+    def test_02_concurrent_signup(self, client, user, monkeypatch):
+        from api.mixins import UserValidationMixin
+
+        # Параллельный запрос успел создать пользователя после проверки.
+        monkeypatch.setattr(
+            UserValidationMixin, 'validate', lambda self, data: data
+        )
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'late_user', 'email': user.email
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что гонка регистраций с одним email не приводит к '
+            'ошибке сервера.'
+        )
+        response = client.post(self.URL_SIGNUP, data={
+            'username': user.username, 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_SIGNUP, data={
+            'username': user.username, 'email': user.email
+        })
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ConfirmationCode:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_targeted_update(self, user):
+        with CaptureQueriesContext(connection) as context:
+            user.set_confirmation_code()
+        assert len(context.captured_queries) == 1
+        sql = context.captured_queries[0]['sql']
+        assert sql.startswith('UPDATE') and 'bio' not in sql, (
+            'Проверьте, что выдача кода обновляет только его колонки.'
+        )
+        user.refresh_from_db()
+        assert user.confirmation_code_expires_at > timezone.now(), (
+            'Проверьте, что у кода подтверждения есть срок действия.'
+        )
+
+    def test_02_expired_code_rejected(self, client):
+        from reviews.models import User
+
+        client.post(self.URL_SIGNUP, data={
+            'username': 'expiring', 'email': 'expiring@yamdb.fake'
+        })
+        user = User.objects.get(username='expiring')
+        User.objects.filter(pk=user.pk).update(
+            confirmation_code_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'expiring',
+            'confirmation_code': user.confirmation_code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
+
+    def test_03_purge_expired_codes(self, django_user_model):
+        now = timezone.now()
+        for idx in range(4):
+            django_user_model.objects.create(
+                username=f'purge{idx}', email=f'purge{idx}@yamdb.fake',
+                confirmation_code='123456',
+                confirmation_code_expires_at=now + timedelta(
+                    hours=1 if idx == 3 else -1
+                ),
+            )
+        call_command(
+            'purge_confirmation_codes', batch_size=2, stdout=StringIO()
+        )
+        codes = dict(django_user_model.objects.values_list(
+            'username', 'confirmation_code'
+        ))
+        assert codes == {
+            'purge0': '', 'purge1': '', 'purge2': '', 'purge3': '123456'
+        }, 'Проверьте, что команда удаляет только просроченные коды.'
@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleSearch:
+
+    URL_TITLES = '/api/v1/titles/'
+
+    def create_titles(self):
+        from reviews.models import Title
+
+        return [
+            Title.objects.create(name='Солярис', year=1972,
+                                 description='Фильм о планете-океане.'),
+            Title.objects.create(
+                name='Сталкер', year=1979,
+                description='Экранизация романа, похожего на Солярис.'
+            ),
+            Title.objects.create(name='Зеркало', year=1975, description=''),
+        ]
+
+    def search(self, client, text):
+        response = client.get(self.URL_TITLES, {'search': text})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ranked_results(self, client):
+        self.create_titles()
+        assert self.search(client, 'солярис') == ['Солярис', 'Сталкер'], (
+            'Проверьте, что поиск находит произведения по названию и '
+            'описанию и что совпадение в названии ранжируется выше.'
+        )
+        assert self.search(client, 'роман солярис') == [], (
+            'Проверьте, что поиск ищет слова целиком и требует все слова.'
+        )
+        assert self.search(client, 'Экранизация романа') == ['Сталкер']
+        assert self.search(client, '!!!') == []
+
+    def test_02_index_is_synced(self, client):
+        from reviews.models import Title
+
+        solaris, stalker, mirror = self.create_titles()
+        Title.objects.filter(pk=mirror.pk).update(description='Про Солярис')
+        stalker.delete()
+        solaris.name = 'Solaris'
+        solaris.save()
+        assert self.search(client, 'солярис') == ['Зеркало'], (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении произведений, в том числе через update().'
+        )
+        assert self.search(client, 'solaris') == ['Solaris']
+
+    def test_03_prefix_search(self):
+        from reviews.models import Title
+
+        self.create_titles()
+        names = Title.objects.search('стал', prefix=True).values_list(
+            'name', flat=True
+        )
+        assert list(names) == ['Сталкер']
+        assert not Title.objects.search('стал').exists()
+
+    def test_04_uses_index(self, client):
+        self.create_titles()
+        with CaptureQueriesContext(connection) as context:
+            self.search(client, 'солярис')
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        if connection.vendor == 'sqlite':
+            assert 'reviews_title_fts' in sql
+        assert 'LIKE' not in sql, (
+            'Проверьте, что поиск использует полнотекстовый индекс, а не '
+            'LIKE.'
+        )
+
+    def test_05_triggers_restored_after_migrate(self, client):
+        from django.core.management import call_command
+
+        from reviews.search import SEARCH_INDEXES, fts_table
+
+        def get_triggers():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )
+                return {name for name, in cursor.fetchall()}
+
+        expected = {
+            f'{fts_table(table)}_{suffix}'
+            for table in SEARCH_INDEXES
+            for suffix in ('insert', 'delete', 'update')
+        }
+        assert expected <= get_triggers(), (
+            'Проверьте, что после миграций у всех индексируемых таблиц '
+            'есть триггеры поискового индекса.'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_fts_insert')
+        self.create_titles()
+        call_command('migrate', verbosity=0)
+        assert expected <= get_triggers(), (
+            'Проверьте, что migrate восстанавливает триггеры, удалённые '
+            'пересозданием таблицы.'
+        )
+        assert self.search(client, 'солярис') == ['Солярис', 'Сталкер'], (
+            'Проверьте, что после восстановления триггеров индекс '
+            'перестраивается.'
+        )
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TextSearch:
+
+    URL_REVIEWS = '/api/v1/search/reviews/'
+    URL_COMMENTS = '/api/v1/search/comments/'
+
+    def create_data(self, user, moderator):
+        from reviews.models import Comment, Review, Title
+
+        solaris = Title.objects.create(name='Солярис', year=1972)
+        stalker = Title.objects.create(name='Сталкер', year=1979)
+        reviews = [
+            Review.objects.create(
+                title=solaris, author=user, score=9,
+                text='Медленное кино про океан, океан и снова океан.'
+            ),
+            Review.objects.create(
+                title=stalker, author=user, score=8,
+                text='Медленное кино, в котором тоже есть океан.'
+            ),
+            Review.objects.create(
+                title=stalker, author=moderator, score=2,
+                text='Слишком медленно.'
+            ),
+        ]
+        Comment.objects.create(
+            review=reviews[0], author=moderator, text='Океан - главный герой.'
+        )
+        Comment.objects.create(
+            review=reviews[1], author=user, text='Согласен про кино.'
+        )
+        return solaris, stalker, reviews
+
+    def search(self, client, url, **params):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_permissions(self, client, user_client, moderator_client,
+                            admin_client):
+        for url in (self.URL_REVIEWS, self.URL_COMMENTS):
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+            assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что поиск по отзывам и комментариям недоступен '
+                'обычному пользователю.'
+            )
+            assert moderator_client.get(url).status_code == HTTPStatus.OK
+            assert admin_client.get(url).status_code == HTTPStatus.OK
+
+    def test_02_ranked_and_filtered(self, moderator_client, user, moderator):
+        solaris, stalker, reviews = self.create_data(user, moderator)
+        data = self.search(
+            moderator_client, self.URL_REVIEWS, search='океан'
+        )
+        assert data['count'] == 2
+        assert [review['id'] for review in data['results']] == [
+            reviews[0].id, reviews[1].id
+        ], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+        data = self.search(
+            moderator_client, self.URL_REVIEWS, search='медленное кино',
+            title=stalker.id
+        )
+        assert [review['id'] for review in data['results']] == [
+            reviews[1].id
+        ]
+        data = self.search(
+            moderator_client, self.URL_REVIEWS, author=moderator.username
+        )
+        assert [review['id'] for review in data['results']] == [
+            reviews[2].id
+        ]
+        data = self.search(
+            moderator_client, self.URL_COMMENTS, search='океан',
+            title=solaris.id
+        )
+        assert [comment['text'] for comment in data['results']] == [
+            'Океан - главный герой.'
+        ]
+        data = self.search(
+            moderator_client, self.URL_COMMENTS, search='кино',
+            date_to='2000-01-01T00:00:00'
+        )
+        assert data['count'] == 0, (
+            'Проверьте, что поиск фильтруется по дате публикации.'
+        )
+
+    def test_03_index_is_synced(self, moderator_client, user, moderator):
+        from reviews.models import Review
+
+        _, _, reviews = self.create_data(user, moderator)
+        reviews[0].text = 'Переписанный отзыв.'
+        reviews[0].save()
+        Review.objects.filter(pk=reviews[1].pk).delete()
+        assert self.search(
+            moderator_client, self.URL_REVIEWS, search='океан'
+        )['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении отзывов.'
+        )
+        assert self.search(
+            moderator_client, self.URL_REVIEWS, search='переписанный'
+        )['count'] == 1
+        assert self.search(
+            moderator_client, self.URL_COMMENTS, search='согласен'
+        )['count'] == 0, (
+            'Проверьте, что комментарии удалённого отзыва пропадают из '
+            'поиска.'
+        )
+
+    def test_04_admin_search(self, client, user_superuser, user, moderator):
+        from reviews.models import Review
+
+        _, _, reviews = self.create_data(user, moderator)
+        client.force_login(user_superuser)
+        response = client.get('/admin/reviews/review/', {'q': 'океан'})
+        assert response.status_code == HTTPStatus.OK
+        assert set(
+            response.context['cl'].queryset.values_list('pk', flat=True)
+        ) == {reviews[0].pk, reviews[1].pk}
+        response = client.get(
+            '/admin/reviews/review/', {'q': moderator.username}
+        )
+        assert list(
+            response.context['cl'].queryset.values_list('pk', flat=True)
+        ) == [reviews[2].pk]
+        assert Review.objects.search('').count() == 0
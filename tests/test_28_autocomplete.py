@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Autocomplete:
+
+    URL = '/api/v1/autocomplete/'
+
+    def create_data(self):
+        from reviews.models import Category, Genre, Title
+
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Детектив', slug='detective')
+        Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        Title.objects.create(name='Ёжик в тумане', year=1975)
+
+    def complete(self, client, **params):
+        response = client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [item['name'] for item in response.json()]
+
+    def test_01_prefix_match(self, client):
+        self.create_data()
+        assert self.complete(client, q='д') == ['Детектив', 'Драма'], (
+            'Проверьте, что подсказки ищутся по началу названия.'
+        )
+        assert self.complete(client, q='шоу') == ['Побег из Шоушенка'], (
+            'Проверьте, что подсказки ищутся по началу любого слова.'
+        )
+        assert self.complete(client, q='ежик В') == ['Ёжик в тумане'], (
+            'Проверьте, что запрос нормализуется.'
+        )
+        assert self.complete(client, q='mov') == ['Фильм'], (
+            'Проверьте, что жанры и категории ищутся и по слагу.'
+        )
+        response = client.get(self.URL, {'q': 'dra'})
+        assert response.json() == [
+            {'type': 'genre', 'name': 'Драма', 'slug': 'drama'}
+        ]
+        assert self.complete(client, q='д', type='title') == []
+        assert self.complete(client, q='д', limit=1) == ['Детектив']
+        assert self.complete(client, q='') == []
+
+    def test_02_invalid_params(self, client):
+        for params in ({'type': 'user'}, {'limit': 0}, {'limit': 'x'},
+                       {'limit': 1000}):
+            response = client.get(self.URL, {'q': 'д', **params})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_invalidated_on_write(self, client, admin_client):
+        from reviews.models import Title
+
+        self.create_data()
+        assert self.complete(client, q='драма') == ['Драма']
+        with CaptureQueriesContext(connection) as context:
+            assert self.complete(client, q='д') == ['Детектив', 'Драма']
+        assert not context.captured_queries, (
+            'Проверьте, что подсказки отдаются из индекса в памяти без '
+            'запросов к БД.'
+        )
+        response = admin_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        Title.objects.filter(name='Ёжик в тумане').delete()
+        Title.objects.create(name='Дюна', year=2021)
+        assert self.complete(client, q='д') == ['Детектив', 'Дюна'], (
+            'Проверьте, что индекс перестраивается после изменений.'
+        )
+        assert self.complete(client, q='ежик') == []
+
+    def test_04_index_search(self):
+        from api.autocomplete import PrefixIndex, normalize
+
+        assert normalize(' Ёж-2__Тест ') == 'еж 2 тест'
+        index = PrefixIndex([
+            (('Тест тестов',), {'type': 'title', 'name': 'Тест тестов'}),
+            (('Тесто',), {'type': 'title', 'name': 'Тесто'}),
+        ])
+        assert [item['name'] for item in index.search('тест', 10)] == [
+            'Тест тестов', 'Тесто'
+        ], 'Проверьте, что объект попадает в подсказки один раз.'
+
+    def test_05_word_keys(self):
+        from api.autocomplete import PrefixIndex
+
+        name = ' '.join(f'слово{idx}' for idx in range(50))
+        index = PrefixIndex([
+            ((name,), {'type': 'title', 'name': name}),
+            (('Ёжик в тумане',), {'type': 'title', 'name': 'Ёжик в тумане'}),
+            (('Вестерн', 'western'),
+             {'type': 'genre', 'name': 'Вестерн', 'slug': 'western'}),
+        ])
+        assert sum(map(len, index.keys['title'])) == sum(
+            len(word) for word in f'{name} ежик в тумане'.split()
+        ), (
+            'Проверьте, что индекс хранит слова названий, а не все их '
+            'окончания: память должна расти линейно от длины названия.'
+        )
+        assert index.keys['genre'] == ['western', 'вестерн']
+        assert [item['name'] for item in index.search('в тум', 10)] == [
+            'Ёжик в тумане'
+        ], 'Проверьте, что запрос из нескольких слов ищется с любого слова.'
+        assert index.search('в туманы', 10) == []
+        assert [item['name'] for item in index.search('в', 10)] == [
+            'Ёжик в тумане', 'Вестерн'
+        ]
+        assert [
+            item['name'] for item in index.search('в', 10, kinds=('genre',))
+        ] == ['Вестерн']
+        assert index.search('слово49 слово4', 10) == [], (
+            'Проверьте, что слова запроса должны идти в названии подряд.'
+        )
+        assert len(index.search('слово48 слово4', 10)) == 1
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Leaderboards:
+
+    URL = '/api/v1/leaderboards/'
+
+    @pytest.fixture(autouse=True)
+    def rating_settings(self, settings):
+        settings.RATING_PRIOR_MEAN = 5
+        settings.RATING_PRIOR_COUNT = 2
+        settings.LEADERBOARD_MIN_REVIEWS = 2
+
+    def create_data(self, django_user_model):
+        from reviews.models import Category, Genre, Review, Title
+
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        book = Category.objects.create(name='Книга', slug='book')
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(4)
+        ]
+        titles = {}
+        for name, category, genres, scores in (
+            ('Много хороших', movie, (drama,), (9, 9, 9, 9)),
+            ('Две отличные', movie, (comedy,), (10, 10)),
+            ('Одна отличная', book, (drama,), (10,)),
+            ('Плохая', book, (drama, comedy), (2, 3, 2)),
+        ):
+            title = Title.objects.create(
+                name=name, year=2000, category=category
+            )
+            title.genre.set(genres)
+            for author, score in zip(authors, scores):
+                Review.objects.create(
+                    title=title, author=author, score=score, text='Отзыв'
+                )
+            titles[name] = title
+        return titles
+
+    def get_names(self, client, **params):
+        response = client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()]
+
+    def test_01_weighted_order(self, client, django_user_model):
+        self.create_data(django_user_model)
+        assert self.get_names(client) == [
+            'Много хороших', 'Две отличные', 'Плохая'
+        ], (
+            'Проверьте, что рейтинг лучших упорядочен по взвешенному '
+            'рейтингу и не включает произведения с малым числом оценок.'
+        )
+        assert self.get_names(client, genre='drama') == [
+            'Много хороших', 'Плохая'
+        ]
+        assert self.get_names(client, category='movie') == [
+            'Много хороших', 'Две отличные'
+        ]
+        assert self.get_names(client, limit=1) == ['Много хороших']
+        response = client.get(self.URL, {'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        title = client.get(self.URL).json()[0]
+        assert title['weighted_rating'] == pytest.approx(46 / 6)
+        assert title['rating_count'] == 4
+
+    def test_02_updated_on_review_change(self, client, django_user_model):
+        from reviews.models import Review
+
+        titles = self.create_data(django_user_model)
+        assert self.get_names(client, category='book') == ['Плохая']
+        for review in Review.objects.filter(title=titles['Плохая']):
+            review.score = 10
+            review.save()
+        author = django_user_model.objects.get(username='author3')
+        Review.objects.create(
+            title=titles['Одна отличная'], author=author, score=10,
+            text='Отзыв'
+        )
+        assert self.get_names(client, category='book') == [
+            'Плохая', 'Одна отличная'
+        ], (
+            'Проверьте, что рейтинг лучших обновляется при изменении '
+            'отзывов.'
+        )
+        Review.objects.filter(author=author).delete()
+        assert self.get_names(client, category='book') == ['Плохая']
+
+    def test_03_no_aggregation(self, client, django_user_model):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.create_data(django_user_model)
+        with CaptureQueriesContext(connection) as context:
+            self.get_names(client, genre='drama')
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что рейтинг лучших не агрегирует отзывы при '
+            'запросе.'
+        )
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30TitleOrdering:
+
+    URL_TITLES = '/api/v1/titles/'
+
+    def create_titles(self):
+        from reviews.models import Title
+
+        for name, year, rating, count in (
+            ('Альфа', 1990, 7, 3),
+            ('Бета', 2005, 9, 1),
+            ('Гамма', 2010, None, 0),
+            ('Дельта', 1975, 7, 5),
+        ):
+            Title.objects.create(name=name, year=year)
+            Title.objects.filter(name=name).update(
+                rating=rating, rating_count=count,
+                rating_sum=(rating or 0) * count
+            )
+
+    def get_names(self, client, **params):
+        response = client.get(self.URL_TITLES, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ordering(self, client):
+        self.create_titles()
+        assert self.get_names(client, ordering='-rating') == [
+            'Бета', 'Альфа', 'Дельта', 'Гамма'
+        ], (
+            'Проверьте, что сортировка по рейтингу ставит произведения без '
+            'оценок в конец, а при равном рейтинге сортирует по названию.'
+        )
+        assert self.get_names(client, ordering='rating') == [
+            'Альфа', 'Дельта', 'Бета', 'Гамма'
+        ]
+        assert self.get_names(client, ordering='year') == [
+            'Дельта', 'Альфа', 'Бета', 'Гамма'
+        ]
+        assert self.get_names(client, ordering='-review_count') == [
+            'Дельта', 'Альфа', 'Бета', 'Гамма'
+        ]
+        assert self.get_names(client, ordering='-name') == [
+            'Дельта', 'Гамма', 'Бета', 'Альфа'
+        ]
+        assert self.get_names(client) == ['Альфа', 'Бета', 'Гамма', 'Дельта']
+        response = client.get(self.URL_TITLES, {'ordering': 'description'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_range_filters(self, client):
+        self.create_titles()
+        assert self.get_names(client, rating_min=8) == ['Бета']
+        assert self.get_names(client, rating_max=7) == ['Альфа', 'Дельта']
+        assert self.get_names(
+            client, year_min=1980, year_max=2005, ordering='-year'
+        ) == ['Бета', 'Альфа'], (
+            'Проверьте фильтры year_min и year_max.'
+        )
+
+    def test_03_search_with_ordering(self, client):
+        from reviews.models import Title
+
+        self.create_titles()
+        Title.objects.filter(name__in=('Альфа', 'Бета')).update(
+            description='Космос'
+        )
+        assert self.get_names(
+            client, search='космос', ordering='-rating'
+        ) == ['Бета', 'Альфа'], (
+            'Проверьте, что параметр ordering заменяет сортировку по '
+            'релевантности.'
+        )
+
+    def test_04_uses_index(self):
+        from reviews.models import Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется для SQLite.')
+        queryset = Title.objects.filter(rating__gte=5).order_by(
+            '-rating', 'name'
+        )[:10]
+        plan = queryset.explain()
+        assert 'title_rating_name_idx' in plan, (
+            'Проверьте, что фильтр и сортировка по рейтингу используют '
+            'индекс.'
+        )
+
+    def test_05_range_filters_use_average(self, client):
+        from reviews.models import Title
+
+        self.create_titles()
+        Title.objects.create(name='Эпсилон', year=2000)
+        Title.objects.filter(name='Эпсилон').update(
+            rating=7, rating_sum=79, rating_count=10
+        )
+        assert self.get_names(client, rating_min=8) == ['Бета'], (
+            'Проверьте, что rating_min сравнивается со средней оценкой.'
+        )
+        assert self.get_names(client, rating_max=7) == ['Альфа', 'Дельта'], (
+            'Проверьте, что rating_max не пропускает произведение со '
+            'средней оценкой 7.9.'
+        )
+        assert self.get_names(client, rating_min=7.9, rating_max=7.9) == [
+            'Эпсилон'
+        ]
+        assert self.get_names(client, rating_min=7.5) == ['Бета', 'Эпсилон']
+        response = client.get(self.URL_TITLES, {'rating_min': '1e100'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
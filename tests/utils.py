@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from django.core.mail.backends.locmem import EmailBackend
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +307,39 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+class CountingBackend(EmailBackend):
+    """Как и SMTP-бэкенд, не открывает уже открытое соединение."""
+    opened = 0
+    is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+
+class FailingBackend(EmailBackend):
+    """
+    Не отправляет письма адресатам из failing, а если он пуст - всем:
+    бросает error и считает попытки в attempts.
+    """
+    failing = ()
+    attempts = 0
+
+    @staticmethod
+    def error(message):
+        return ConnectionError('SMTP недоступен')
+
+    def send_messages(self, messages):
+        for message in messages:
+            if not self.failing or set(message.to) & set(self.failing):
+                FailingBackend.attempts += 1
+                raise self.error(message)
+        return super().send_messages(messages)